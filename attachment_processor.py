@@ -1,6 +1,8 @@
 # attachment_processor.py
 
 import os
+import io
+import sys
 import pandas as pd
 import re
 import logging
@@ -29,6 +31,54 @@ try:
 except ImportError:
     logger.warning("docx2txt not installed. Word document processing will be limited.")
 
+# Try to import PyMuPDF (renders scanned PDF pages for OCR)
+try:
+    import fitz
+except ImportError:
+    logger.warning("PyMuPDF not installed. Scanned PDFs cannot be OCR'd.")
+
+# Field extraction patterns, compiled once: (field, pattern, strip thousands separators)
+_INVOICE_NO_RE = re.compile(r'Invoice\s*No\.?:?\s*([A-Za-z0-9\-/]+)')
+_DATE_VALUE = r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{1,2}\s+[A-Za-z]{3,}\s+\d{2,4})'
+_MONEY_VALUE = r'[₹$€£]?\s*([\d,]+\.\d{2}|\d+)'
+_FIELD_PATTERNS = (
+    ('Invoice_Number', _INVOICE_NO_RE, False),
+    ('Invoice_Date', re.compile(r'Date\s*:?\s*' + _DATE_VALUE), False),
+    ('Amount', re.compile(r'Total\s*:?\s*' + _MONEY_VALUE), True),
+    ('GST_Number', re.compile(r'GSTIN\s*:?\s*([0-9A-Z]{15})'), False),
+    ('Invoice_Currency', re.compile(r'Currency\s*:?\s*([A-Z]{3})'), False),
+    ('TDS', re.compile(r'TDS\s*:?\s*' + _MONEY_VALUE), True),
+    ('VAT', re.compile(r'VAT\s*:?\s*' + _MONEY_VALUE), True),
+    ('Total_Invoice_Value', re.compile(r'Grand Total\s*:?\s*' + _MONEY_VALUE), True),
+    ('Location', re.compile(r'Location\s*:?\s*([A-Za-z, ]+)'), False),
+    ('Due_Date', re.compile(r'Due Date\s*:?\s*' + _DATE_VALUE), False),
+    ('Invoice_ID', re.compile(r'Invoice ID\s*:?\s*([A-Za-z0-9\-/]+)'), False),
+    ('MOP', re.compile(r'Payment Method\s*:?\s*([A-Za-z ]+)'), False),
+    ('AH', re.compile(r'Account Head\s*:?\s*([A-Za-z0-9 ]+)'), False),
+    ('SCID', re.compile(r'SCID\s*:?\s*([A-Za-z0-9\-]+)'), False),
+)
+_INVOICE_FILE_RE = re.compile(r'inv(oice)?[-_]?\d+')
+
+def render_pages(pdf_path, dpi=150, batch=16):
+    """Yield PNG bytes for a PDF's pages, `batch` pages at a time, so memory stays O(batch)"""
+    with fitz.open(pdf_path) as doc:
+        n = len(doc)
+        for i in range(0, n, batch):
+            pngs = []
+            for j in range(i, min(i + batch, n)):
+                pix = doc[j].get_pixmap(dpi=dpi)
+                pngs.append(pix.tobytes("png"))
+                del pix
+            yield pngs
+
+def ocr_pdf_pages(pdf_path):
+    """OCR a PDF with no text layer, rendering and recognising one batch of pages at a time"""
+    texts = []
+    for pngs in render_pages(pdf_path):
+        for png in pngs:
+            texts.append(pytesseract.image_to_string(Image.open(io.BytesIO(png))))
+    return "\n".join(texts)
+
 def extract_data_from_pdf(file_path):
     """Extract structured data from PDF invoices"""
     try:
@@ -48,78 +98,19 @@ def extract_data_from_pdf(file_path):
             for page_num in range(len(pdf_reader.pages)):
                 text += pdf_reader.pages[page_num].extract_text()
         
+        # Scanned PDF (no text layer): fall back to OCR over rendered pages
+        if not text.strip() and all(m in sys.modules for m in ('fitz', 'pytesseract', 'PIL.Image')):
+            logger.info(f"No text layer in {file_path}; running OCR on rendered pages")
+            text = ocr_pdf_pages(file_path)
+        
         # Extract relevant fields using regex patterns
         data = {}
         
-        # Invoice Number pattern
-        inv_num_match = re.search(r'Invoice\s*No\.?:?\s*([A-Za-z0-9\-/]+)', text)
-        if inv_num_match:
-            data['Invoice_Number'] = inv_num_match.group(1).strip()
-        
-        # Invoice Date pattern
-        date_match = re.search(r'Date\s*:?\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{1,2}\s+[A-Za-z]{3,}\s+\d{2,4})', text)
-        if date_match:
-            data['Invoice_Date'] = date_match.group(1).strip()
-        
-        # Amount pattern
-        amount_match = re.search(r'Total\s*:?\s*[₹$€£]?\s*([\d,]+\.\d{2}|\d+)', text)
-        if amount_match:
-            data['Amount'] = amount_match.group(1).strip().replace(',', '')
-        
-        # GST Number pattern
-        gst_match = re.search(r'GSTIN\s*:?\s*([0-9A-Z]{15})', text)
-        if gst_match:
-            data['GST_Number'] = gst_match.group(1).strip()
-        
-        # Currency pattern
-        currency_match = re.search(r'Currency\s*:?\s*([A-Z]{3})', text)
-        if currency_match:
-            data['Invoice_Currency'] = currency_match.group(1).strip()
-        
-        # TDS pattern
-        tds_match = re.search(r'TDS\s*:?\s*[₹$€£]?\s*([\d,]+\.\d{2}|\d+)', text)
-        if tds_match:
-            data['TDS'] = tds_match.group(1).strip().replace(',', '')
-        
-        # VAT pattern
-        vat_match = re.search(r'VAT\s*:?\s*[₹$€£]?\s*([\d,]+\.\d{2}|\d+)', text)
-        if vat_match:
-            data['VAT'] = vat_match.group(1).strip().replace(',', '')
-        
-        # Total Invoice Value pattern
-        total_match = re.search(r'Grand Total\s*:?\s*[₹$€£]?\s*([\d,]+\.\d{2}|\d+)', text)
-        if total_match:
-            data['Total_Invoice_Value'] = total_match.group(1).strip().replace(',', '')
-        
-        # Location pattern
-        location_match = re.search(r'Location\s*:?\s*([A-Za-z, ]+)', text)
-        if location_match:
-            data['Location'] = location_match.group(1).strip()
-        
-        # Due Date pattern
-        due_date_match = re.search(r'Due Date\s*:?\s*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{1,2}\s+[A-Za-z]{3,}\s+\d{2,4})', text)
-        if due_date_match:
-            data['Due_Date'] = due_date_match.group(1).strip()
-        
-        # Invoice ID pattern
-        inv_id_match = re.search(r'Invoice ID\s*:?\s*([A-Za-z0-9\-/]+)', text)
-        if inv_id_match:
-            data['Invoice_ID'] = inv_id_match.group(1).strip()
-        
-        # Payment Method pattern
-        mop_match = re.search(r'Payment Method\s*:?\s*([A-Za-z ]+)', text)
-        if mop_match:
-            data['MOP'] = mop_match.group(1).strip()
-        
-        # Account Head pattern
-        ah_match = re.search(r'Account Head\s*:?\s*([A-Za-z0-9 ]+)', text)
-        if ah_match:
-            data['AH'] = ah_match.group(1).strip()
-        
-        # SCID pattern
-        scid_match = re.search(r'SCID\s*:?\s*([A-Za-z0-9\-]+)', text)
-        if scid_match:
-            data['SCID'] = scid_match.group(1).strip()
+        for field, pattern, strip_commas in _FIELD_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                value = match.group(1).strip()
+                data[field] = value.replace(',', '') if strip_commas else value
         
         # Log extraction success
         logger.info(f"Successfully extracted {len(data)} fields from PDF: {file_path}")
@@ -144,7 +135,7 @@ def extract_data_from_image(file_path):
         data = {}
         
         # Invoice Number pattern
-        inv_num_match = re.search(r'Invoice\s*No\.?:?\s*([A-Za-z0-9\-/]+)', text)
+        inv_num_match = _INVOICE_NO_RE.search(text)
         if inv_num_match:
             data['Invoice_Number'] = inv_num_match.group(1).strip()
         
@@ -172,7 +163,7 @@ def extract_data_from_doc(file_path):
         data = {}
         
         # Invoice Number pattern
-        inv_num_match = re.search(r'Invoice\s*No\.?:?\s*([A-Za-z0-9\-/]+)', text)
+        inv_num_match = _INVOICE_NO_RE.search(text)
         if inv_num_match:
             data['Invoice_Number'] = inv_num_match.group(1).strip()
         
@@ -241,7 +232,6 @@ def process_invoice_file(file_path):
 def process_invoice_attachments(invoice_id, zip_path, extract_dir):
     """Process invoice attachments from ZIP file and validate against database records"""
     import zipfile
-    import sys
     
     try:
         # Extract the ZIP file if not already extracted
@@ -271,7 +261,7 @@ def process_invoice_attachments(invoice_id, zip_path, extract_dir):
                     invoice_files.append(file_path)
                     logger.info(f"Found matching file for invoice {invoice_id}: {file}")
                 # Also check common invoice file patterns
-                elif re.search(r'inv(oice)?[-_]?\d+', file.lower()):
+                elif _INVOICE_FILE_RE.search(file.lower()):
                     invoice_files.append(file_path)
                     logger.info(f"Found potential invoice file: {file}")
         
@@ -316,7 +306,6 @@ def process_invoice_attachments(invoice_id, zip_path, extract_dir):
 # For testing
 if __name__ == "__main__":
     # Test with a sample file if available
-    import sys
     if len(sys.argv) > 1:
         file_path = sys.argv[1]
         print(f"Testing with file: {file_path}")
@@ -6,7 +6,8 @@ import glob
 import json
 import logging
 import smtplib
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional, Dict, Tuple, Union
+from functools import lru_cache
 from datetime import datetime, timedelta
 from pathlib import Path
 import zipfile
@@ -22,6 +23,22 @@ from email.utils import formataddr
 __all__ = ["EnhancedEmailSystem", "EmailNotifier"]
 
 
+@lru_cache(maxsize=32)
+def _candidate_regex(candidates: Tuple[str, ...]) -> "re.Pattern":
+    """Case-insensitive 'contains any candidate' pattern, compiled once per candidate list."""
+    return re.compile("|".join(re.escape(c) for c in candidates), re.IGNORECASE)
+
+
+def _col_major_frame(names: List[str], cols: List[list]) -> pd.DataFrame:
+    """
+    Build a DataFrame from per-column lists (one 1-D array per column, column-major).
+    Avoids the 2-D object array a list of row lists goes through; names may repeat.
+    """
+    out = pd.DataFrame(dict(enumerate(cols)), copy=False)
+    out.columns = names
+    return out
+
+
 class EnhancedEmailSystem:
     """Email system that assembles a reports+invoices ZIP and sends it with a professional HTML body."""
 
@@ -149,15 +166,17 @@ class EnhancedEmailSystem:
             self.logger.warning(f"Could not read detailed validation workbook: {latest}: {e}")
             return None
 
-    def _safe_get(self, row: Dict[str, str], names: List[str]) -> Optional[str]:
-        """Case-insensitive lookup from a row-dict; returns first non-empty value among candidates."""
-        lower_map = {k.lower(): k for k in row.keys()}
-        for name in names:
-            key = lower_map.get(name.lower())
-            if key:
-                v = row.get(key)
-                if pd.notna(v) and str(v).strip() != "":
-                    return str(v).strip()
+    def _resolve_columns(self, df: pd.DataFrame, names: List[str]) -> List[str]:
+        """Resolve candidate names to actual columns once (case-insensitive, priority order kept)."""
+        lower_map = {c.lower(): c for c in df.columns}
+        return [lower_map[n.lower()] for n in names if n.lower() in lower_map]
+
+    def _first_value(self, row, columns: List) -> Optional[str]:
+        """First non-empty value among already-resolved columns (dict keys or tuple positions)."""
+        for key in columns:
+            v = row[key]
+            if pd.notna(v) and str(v).strip() != "":
+                return str(v).strip()
         return None
 
     def _num(self, x) -> float:
@@ -174,14 +193,11 @@ class EnhancedEmailSystem:
         for cand in candidates:
             if cand.lower() in lmap:
                 return lmap[cand.lower()]
-        # fuzzy contains
-        for c in df.columns:
-            lc = c.lower()
-            if any(tok.lower() in lc for tok in candidates):
-                return c
-        return None
+        # fuzzy contains: one compiled alternation instead of a substring scan per candidate
+        pattern = _candidate_regex(tuple(candidates))
+        return next((c for c in df.columns if pattern.search(c)), None)
 
-    def _load_creator_lookup_from_df(self, df: pd.DataFrame) , str]:
+    def _load_creator_lookup_from_df(self, df: pd.DataFrame) -> Dict[str, str]:
         """Try to detect invoice number column and creator column in an arbitrary dataframe."""
         inv_col = self._select_column(
             df,
@@ -342,38 +358,70 @@ class EnhancedEmailSystem:
             "SCID",
         ]
 
-        out_rows: List[List[Optional[str]]] = []
+        today_str = datetime.now().strftime("%Y-%m-%d")
+        # Accumulated column-wise; one list per output column
+        out_cols: List[list] = [[] for _ in columns]
         df_rms = df_rms.fillna("")
-        for idx, r in df_rms.iterrows():
-            row = r.to_dict()
-
-            invoice_no = self._safe_get(row, ["PurchaseInvNo","Invoice Number","Invoice_No","InvoiceNumber","VoucherNo"]) or ""
-            vendor = self._safe_get(row, ["PartyName","Vendor Name","Vendor_Name"]) or ""
-            inv_date = self._safe_get(row, ["PurchaseInvDate","Invoice Date","Voucherdate"]) or ""
-            entry_date = self._safe_get(row, ["Voucherdate","Invoice_Entry_Date"]) or inv_date
-            amount = self._safe_get(row, ["Total","Amount","PaytyAmt","TaxableValue"]) or ""
-            # Try many creator headers; if still blank, use lookup
-            creator = (
-                self._safe_get(row, [
+
+        # Resolve source columns once instead of per row
+        src = {
+            key: self._resolve_columns(df_rms, names)
+            for key, names in {
+                "invoice_no": ["PurchaseInvNo","Invoice Number","Invoice_No","InvoiceNumber","VoucherNo"],
+                "vendor": ["PartyName","Vendor Name","Vendor_Name"],
+                "inv_date": ["PurchaseInvDate","Invoice Date","Voucherdate"],
+                "entry_date": ["Voucherdate","Invoice_Entry_Date"],
+                "amount": ["Total","Amount","PaytyAmt","TaxableValue"],
+                "creator": [
                     "Inv Created By","Invoice_Creator_Name","Creator","CreatedBy","Created By","Inv_Created_By","Invoice Created By"
-                ]) or creator_lookup.get(invoice_no, "Unknown")
-            )
+                ],
+                "location": ["State","Location"],
+                "currency": ["Currency","Invoice currency","Invoice_Currency"],
+                "method": ["Method_of_Payment","Payment Method"],
+                "account_head": ["PurchaseLEDGER","Account_Head","Narration"],
+                "gst": ["GSTNO","GST_Number","GSTIN"],
+                "rms_id": ["InvID","RMS_Invoice_ID"],
+                "scid": ["SCID"],
+                "due_date": ["Due_Date","Due Date"],
+                "due_note": ["Due_Date_Notification"],
+                "cgst": ["CGSTInputAmt","CGST_Amount"],
+                "sgst": ["SGSTInputAmt","SGST_Amount"],
+                "igst": ["IGST/VATInputAmt","IGST_Amount","IGSTInputAmt"],
+                "vat": ["VAT","VAT_Amount"],
+                "tds": ["TDS","TDS_Status"],
+            }.items()
+        }
+
+        # Positions in itertuples(index=True) rows: slot 0 is the index
+        col_pos = {c: i + 1 for i, c in enumerate(df_rms.columns)}
+        src = {key: [col_pos[c] for c in cols] for key, cols in src.items()}
+
+        for row in df_rms.itertuples(index=True, name=None):
+            idx = row[0]
+
+            invoice_no = self._first_value(row, src["invoice_no"]) or ""
+            vendor = self._first_value(row, src["vendor"]) or ""
+            inv_date = self._first_value(row, src["inv_date"]) or ""
+            entry_date = self._first_value(row, src["entry_date"]) or inv_date
+            amount = self._first_value(row, src["amount"]) or ""
+            # Try many creator headers; if still blank, use lookup
+            creator = self._first_value(row, src["creator"]) or creator_lookup.get(invoice_no, "Unknown")
             creator = self._clean_creator(creator)
 
-            location = self._safe_get(row, ["State","Location"]) or ""
-            currency = self._safe_get(row, ["Currency","Invoice currency","Invoice_Currency"]) or ""
-            method = self._safe_get(row, ["Method_of_Payment","Payment Method"]) or ""
-            account_head = self._safe_get(row, ["PurchaseLEDGER","Account_Head","Narration"]) or ""
-            gst = self._safe_get(row, ["GSTNO","GST_Number","GSTIN"]) or ""
-            rms_id = self._safe_get(row, ["InvID","RMS_Invoice_ID"]) or ""
-            scid = self._safe_get(row, ["SCID"]) or ""
-            due_date = self._safe_get(row, ["Due_Date","Due Date"]) or ""
-            due_note = self._safe_get(row, ["Due_Date_Notification"]) or ""
-
-            cgst = self._num(self._safe_get(row, ["CGSTInputAmt","CGST_Amount"]) or 0)
-            sgst = self._num(self._safe_get(row, ["SGSTInputAmt","SGST_Amount"]) or 0)
-            igst = self._num(self._safe_get(row, ["IGST/VATInputAmt","IGST_Amount","IGSTInputAmt"]) or 0)
-            vat = self._num(self._safe_get(row, ["VAT","VAT_Amount"]) or 0)
+            location = self._first_value(row, src["location"]) or ""
+            currency = self._first_value(row, src["currency"]) or ""
+            method = self._first_value(row, src["method"]) or ""
+            account_head = self._first_value(row, src["account_head"]) or ""
+            gst = self._first_value(row, src["gst"]) or ""
+            rms_id = self._first_value(row, src["rms_id"]) or ""
+            scid = self._first_value(row, src["scid"]) or ""
+            due_date = self._first_value(row, src["due_date"]) or ""
+            due_note = self._first_value(row, src["due_note"]) or ""
+
+            cgst = self._num(self._first_value(row, src["cgst"]) or 0)
+            sgst = self._num(self._first_value(row, src["sgst"]) or 0)
+            igst = self._num(self._first_value(row, src["igst"]) or 0)
+            vat = self._num(self._first_value(row, src["vat"]) or 0)
             total_tax = cgst + sgst + igst + vat
 
             if igst > 0:
@@ -385,7 +433,7 @@ class EnhancedEmailSystem:
             else:
                 tax_type = ""
 
-            tds_raw = self._safe_get(row, ["TDS","TDS_Status"])
+            tds_raw = self._first_value(row, src["tds"])
             tds_status = "Deducted" if self._num(tds_raw) > 0 else (str(tds_raw) if tds_raw not in (None, "", "0", "0.0") else "Not Deducted")
 
             v_status = ""
@@ -414,7 +462,7 @@ class EnhancedEmailSystem:
                 issue_details,              # Issue_Details
                 gst,                        # GST_Number
                 idx,                        # Row_Index
-                datetime.now().strftime("%Y-%m-%d"),  # Validation_Date
+                today_str,                  # Validation_Date
                 currency,                   # Invoice_Currency
                 location,                   # Location (duplicate requested)
                 tax_type,                   # Tax_Type
@@ -429,11 +477,19 @@ class EnhancedEmailSystem:
                 rms_id,                     # RMS_Invoice_ID
                 scid,                       # SCID
             ]
-            out_rows.append(values)
+            for col, value in zip(out_cols, values):
+                col.append(value)
+
+        out_df = _col_major_frame(columns, out_cols)
 
-        out_df = pd.DataFrame(out_rows, columns=columns)
+        # Repeated labels as category, row positions as the narrowest int
+        for c in ("Validation_Status", "Invoice_Creator_Name", "Vendor_Name", "GST_Number",
+                  "Method_of_Payment", "Tax_Type", "TDS_Status", "Invoice_Currency"):
+            out_df[c] = out_df[c].astype("category")
+        if pd.api.types.is_integer_dtype(out_df["Row_Index"]):
+            out_df["Row_Index"] = pd.to_numeric(out_df["Row_Index"], downcast="integer")
 
-        out_path = Path("data") / f"validation_report_formatted_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+        out_path = Path("data") / f"validation_report_formatted_{today_str}.xlsx"
         out_path.parent.mkdir(parents=True, exist_ok=True)
         try:
             with pd.ExcelWriter(out_path, engine="xlsxwriter") as writer:
@@ -515,8 +571,12 @@ class EnhancedEmailSystem:
                 else:
                     self.logger.warning("No invoices.zip found to include real invoices.")
 
-            if os.path.exists(zip_filename) and os.path.getsize(zip_filename) > 0:
-                self.logger.info(f"ZIP created successfully: {zip_filename} ({os.path.getsize(zip_filename)} bytes)")
+            try:
+                zip_size = os.stat(zip_filename).st_size
+            except OSError:
+                zip_size = 0
+            if zip_size > 0:
+                self.logger.info(f"ZIP created successfully: {zip_filename} ({zip_size} bytes)")
                 return zip_filename
 
             self.logger.error("ZIP file creation failed or file is empty")
@@ -534,77 +594,77 @@ class EnhancedEmailSystem:
     # ---------- Email sender ----------
 
     def _split_emails(self, raw: Union[str, List[str], None]) -> List[str]:
-    if not raw:
-        return []
-    if isinstance(raw, list):
-        parts = raw
-    else:
-        parts = re.split(r'[;,]', raw)
-    cleaned = []
-    for p in parts:
-        e = p.strip()
-        if e:
-            cleaned.append(e)
-    return cleaned
-
-def send_email(self, to_emails: Union[str, List[str]], subject: str,
-               body_text: str, body_html: str = None, 
-               cc_emails: Union[str, List[str]] = None,
-               attachments: List[str] = None) -> bool:
-    try:
-        to_list = self._split_emails(to_emails)
-        cc_list = self._split_emails(cc_emails)
-
-        if not to_list:
-            self.logger.error("No valid TO recipients configured")
-            return False
+        if not raw:
+            return []
+        if isinstance(raw, list):
+            parts = raw
+        else:
+            parts = re.split(r'[;,]', raw)
+        cleaned = []
+        for p in parts:
+            e = p.strip()
+            if e:
+                cleaned.append(e)
+        return cleaned
+
+    def send_email(self, to_emails: Union[str, List[str]], subject: str,
+                   body_text: str, body_html: str = None, 
+                   cc_emails: Union[str, List[str]] = None,
+                   attachments: List[str] = None) -> bool:
+        try:
+            to_list = self._split_emails(to_emails)
+            cc_list = self._split_emails(cc_emails)
+
+            if not to_list:
+                self.logger.error("No valid TO recipients configured")
+                return False
+
+            # Root must be multipart/mixed for attachments
+            root = MIMEMultipart('mixed')
+            root['From'] = self.from_email or self.username
+            root['To'] = ', '.join(to_list)
+            if cc_list:
+                root['Cc'] = ', '.join(cc_list)
+            root['Subject'] = subject or "Invoice Validation Report"
+            # Optional: improve reply path
+            if self.from_email:
+                root['Reply-To'] = self.from_email
+
+            # Build the alternative part (text + html)
+            alt = MIMEMultipart('alternative')
+            alt.attach(MIMEText(body_text or "(no text body)", 'plain', 'utf-8'))
+            if body_html:
+                alt.attach(MIMEText(body_html, 'html', 'utf-8'))
+            root.attach(alt)
+
+            # Attach files
+            if attachments:
+                for attachment in attachments:
+                    if os.path.exists(attachment) and os.path.isfile(attachment):
+                        with open(attachment, 'rb') as f:
+                            part = MIMEBase('application', 'octet-stream')
+                            part.set_payload(f.read())
+                        encoders.encode_base64(part)
+                        filename = os.path.basename(attachment)
+                        part.add_header('Content-Disposition', f'attachment; filename="{filename}"')
+                        root.attach(part)
+                        self.logger.info(f"Added attachment: {filename}")
+
+            all_recipients = to_list + cc_list
+
+            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                server.ehlo()
+                server.starttls()
+                server.ehlo()
+                server.login(self.username, self.password)
+                server.send_message(root, to_addrs=all_recipients)
+
+            self.logger.info(f"Production email sent successfully to {len(all_recipients)} recipients")
+            return True
 
-        # Root must be multipart/mixed for attachments
-        root = MIMEMultipart('mixed')
-        root['From'] = self.from_email or self.username
-        root['To'] = ', '.join(to_list)
-        if cc_list:
-            root['Cc'] = ', '.join(cc_list)
-        root['Subject'] = subject or "Invoice Validation Report"
-        # Optional: improve reply path
-        if self.from_email:
-            root['Reply-To'] = self.from_email
-
-        # Build the alternative part (text + html)
-        alt = MIMEMultipart('alternative')
-        alt.attach(MIMEText(body_text or "(no text body)", 'plain', 'utf-8'))
-        if body_html:
-            alt.attach(MIMEText(body_html, 'html', 'utf-8'))
-        root.attach(alt)
-
-        # Attach files
-        if attachments:
-            for attachment in attachments:
-                if os.path.exists(attachment) and os.path.isfile(attachment):
-                    with open(attachment, 'rb') as f:
-                        part = MIMEBase('application', 'octet-stream')
-                        part.set_payload(f.read())
-                    encoders.encode_base64(part)
-                    filename = os.path.basename(attachment)
-                    part.add_header('Content-Disposition', f'attachment; filename="{filename}"')
-                    root.attach(part)
-                    self.logger.info(f"Added attachment: {filename}")
-
-        all_recipients = to_list + cc_list
-
-        with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-            server.login(self.username, self.password)
-            server.send_message(root, to_addrs=all_recipients)
-
-        self.logger.info(f"Production email sent successfully to {len(all_recipients)} recipients")
-        return True
-
-    except Exception as e:
-        self.logger.error(f"Failed to send production email: {e}")
-        return False
+        except Exception as e:
+            self.logger.error(f"Failed to send production email: {e}")
+            return False
 
     def validate_email_config(self) -> List[str]:
         issues: List[str] = []
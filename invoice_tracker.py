@@ -163,8 +163,77 @@ def calculate_invoice_hash(invoice):
     return hashlib.sha256(joined.encode()).hexdigest()
 
 # === Save invoice snapshot (enhanced) ===
+SNAPSHOT_INSERT_SQL = """
+    INSERT OR REPLACE INTO invoice_snapshots (
+        invoice_no, vendor_name, invoice_date, gstin, pan,
+        hsn_code, taxable_value, total_amount, hash, run_date,
+        run_type, batch_start, batch_end, cumulative_start, 
+        cumulative_end, archived, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
+"""
+
+def _snapshot_fields_from_records(invoice_list):
+    """Per-invoice field tuples from a list of dicts / row objects"""
+    for invoice in invoice_list:
+        invoice_hash = calculate_invoice_hash(invoice)
+        
+        # Handle both dict and DataFrame row objects
+        if hasattr(invoice, 'get'):
+            # It's a dictionary
+            invoice_data = invoice
+        else:
+            # It's likely a pandas Series or similar, convert to dict
+            invoice_data = dict(invoice) if hasattr(invoice, 'to_dict') else invoice
+        
+        yield (
+            str(invoice_data.get("Invoice_Number", invoice_data.get("invoice_no", ""))), 
+            str(invoice_data.get("Vendor_Name", invoice_data.get("vendor_name", ""))), 
+            str(invoice_data.get("Invoice_Date", invoice_data.get("invoice_date", ""))),
+            str(invoice_data.get("GST_Number", invoice_data.get("gstin", ""))), 
+            str(invoice_data.get("pan", "")), 
+            str(invoice_data.get("hsn_code", "")),
+            float(invoice_data.get("Amount", invoice_data.get("taxable_value", 0))), 
+            float(invoice_data.get("Amount", invoice_data.get("total_amount", 0))),
+            invoice_hash,
+        )
+
+def _snapshot_fields_from_frame(df):
+    """Same field tuples as _snapshot_fields_from_records, built column-wise from a DataFrame"""
+    n = len(df)
+    
+    def text(*names, default=""):
+        for name in names:
+            if name in df.columns:
+                return df[name].astype(str).tolist()
+        return [str(default)] * n
+    
+    def number(*names):
+        for name in names:
+            if name in df.columns:
+                return df[name].astype(float).tolist()
+        return [0.0] * n
+    
+    # Hash uses the same lowercase keys as calculate_invoice_hash
+    hash_parts = zip(
+        text("invoice_no"), text("vendor_name"), text("invoice_date"), text("gstin"),
+        text("pan"), text("hsn_code"), text("taxable_value", default=0), text("total_amount", default=0),
+    )
+    hashes = (hashlib.sha256("|".join(parts).encode()).hexdigest() for parts in hash_parts)
+    
+    return zip(
+        text("Invoice_Number", "invoice_no"),
+        text("Vendor_Name", "vendor_name"),
+        text("Invoice_Date", "invoice_date"),
+        text("GST_Number", "gstin"),
+        text("pan"),
+        text("hsn_code"),
+        number("Amount", "taxable_value"),
+        number("Amount", "total_amount"),
+        hashes,
+    )
+
 def save_invoice_snapshot(invoice_list, run_date, run_type="standard", **kwargs):
-    """Save invoice snapshot with enhanced metadata"""
+    """Save invoice snapshot with enhanced metadata (accepts a list of dicts or a DataFrame)"""
     try:
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
@@ -174,43 +243,16 @@ def save_invoice_snapshot(invoice_list, run_date, run_type="standard", **kwargs)
         batch_end = kwargs.get('batch_end', run_date)
         cumulative_start = kwargs.get('cumulative_start', run_date)
         cumulative_end = kwargs.get('cumulative_end', run_date)
+        created_at = datetime.now().isoformat()
         
-        for invoice in invoice_list:
-            invoice_hash = calculate_invoice_hash(invoice)
-            
-            # Handle both dict and DataFrame row objects
-            if hasattr(invoice, 'get'):
-                # It's a dictionary
-                invoice_data = invoice
-            else:
-                # It's likely a pandas Series or similar, convert to dict
-                invoice_data = dict(invoice) if hasattr(invoice, 'to_dict') else invoice
-                
-            cursor.execute("""
-                INSERT OR REPLACE INTO invoice_snapshots (
-                    invoice_no, vendor_name, invoice_date, gstin, pan,
-                    hsn_code, taxable_value, total_amount, hash, run_date,
-                    run_type, batch_start, batch_end, cumulative_start, 
-                    cumulative_end, archived, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
-            """, (
-                str(invoice_data.get("Invoice_Number", invoice_data.get("invoice_no", ""))), 
-                str(invoice_data.get("Vendor_Name", invoice_data.get("vendor_name", ""))), 
-                str(invoice_data.get("Invoice_Date", invoice_data.get("invoice_date", ""))),
-                str(invoice_data.get("GST_Number", invoice_data.get("gstin", ""))), 
-                str(invoice_data.get("pan", "")), 
-                str(invoice_data.get("hsn_code", "")),
-                float(invoice_data.get("Amount", invoice_data.get("taxable_value", 0))), 
-                float(invoice_data.get("Amount", invoice_data.get("total_amount", 0))),
-                invoice_hash, 
-                run_date,
-                run_type,
-                batch_start,
-                batch_end, 
-                cumulative_start,
-                cumulative_end,
-                datetime.now().isoformat()
-            ))
+        # DataFrames are read column-wise; no per-row dicts
+        if hasattr(invoice_list, 'columns'):
+            fields = _snapshot_fields_from_frame(invoice_list)
+        else:
+            fields = _snapshot_fields_from_records(invoice_list)
+        
+        run_meta = (run_date, run_type, batch_start, batch_end, cumulative_start, cumulative_end, created_at)
+        cursor.executemany(SNAPSHOT_INSERT_SQL, (f + run_meta for f in fields))
 
         conn.commit()
         conn.close()
@@ -230,8 +272,10 @@ def record_run_window(start_date, end_date, run_type="standard", **kwargs):
         cumulative_start = kwargs.get('cumulative_start', start_date)
         cumulative_end = kwargs.get('cumulative_end', end_date)
         total_days_validated = kwargs.get('total_days_validated', 1)
-        current_run_date = datetime.now().strftime("%Y-%m-%d")
-        current_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = datetime.now()
+        current_run_date = now.strftime("%Y-%m-%d")
+        current_timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+        created_at = now.isoformat()
         
         # Insert into both tables for compatibility
         
@@ -251,7 +295,7 @@ def record_run_window(start_date, end_date, run_type="standard", **kwargs):
             cumulative_start,
             cumulative_end,
             total_days_validated,
-            datetime.now().isoformat()
+            created_at
         ))
         
         # Insert into run_windows (new)
@@ -268,7 +312,7 @@ def record_run_window(start_date, end_date, run_type="standard", **kwargs):
             cumulative_start,
             cumulative_end,
             total_days_validated,
-            datetime.now().isoformat()
+            created_at
         ))
         
         conn.commit()
@@ -14,60 +14,275 @@ except Exception as _e:
     print(f"[warn] PyMuPDF not available ({_e}). PDF parsing will be skipped.")
     
 import os
-import sys, pkgutil, utils
+import sys
 import utils.file_readers as fr
+from utils.excel import column_widths
 import logging
+import logging.handlers
 import sqlite3
 import pandas as pd
 import numpy as np
 import smtplib
 import time
 import json
+import csv
 import shutil
-import glob
 import re
 import zipfile
 import traceback
-import tempfile
 import hashlib
-from typing import List, Optional
-from datetime import datetime, timedelta
+import base64
+import threading
+import multiprocessing
+import queue
+import atexit
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple, Union
-from dataclasses import dataclass, asdict
-from contextlib import contextmanager
+from urllib.parse import unquote, urlparse
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
+from dataclasses import dataclass
+from contextlib import closing, contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import cached_property, lru_cache
+from itertools import chain, islice
+from collections import defaultdict, deque
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
-from email import encoders
-import chardet
+from email.message import Message
+from openpyxl.utils import get_column_letter
 import warnings
+import importlib.util
 
-# Selenium imports with error handling
+# ---- JSON (orjson optional) --------------------------------------------------
 try:
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait, Select
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.common.keys import Keys
-    from selenium.webdriver.common.action_chains import ActionChains
-    from selenium.common.exceptions import (
-        TimeoutException, NoSuchElementException, WebDriverException,
-        ElementClickInterceptedException, StaleElementReferenceException,
-        InvalidSessionIdException
-    )
-    SELENIUM_AVAILABLE = True
-except ImportError as e:
-    print(f"[warn] Selenium not available: {e}")
-    SELENIUM_AVAILABLE = False
+    import orjson
+
+    def _dumps(obj) -> str:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                                | orjson.OPT_NON_STR_KEYS, default=str).decode()
+        except TypeError:
+            # orjson is stricter than json (e.g. ints above 64 bits, mixed key types)
+            return json.dumps(obj, indent=2, default=str)
+except ImportError:
+    orjson = None
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, indent=2, default=str)
+
+# Selenium is heavy to import; only probe for it here and import at the call sites that drive a browser
+SELENIUM_AVAILABLE = importlib.util.find_spec("selenium") is not None
+if not SELENIUM_AVAILABLE:
+    print("[warn] Selenium not available: No module named 'selenium'")
+
+# watchdog (optional) lets the RMS download wait react to file events instead of polling
+WATCHDOG_AVAILABLE = importlib.util.find_spec("watchdog") is not None
+DOWNLOAD_WATCH_TICK = 10.0
+
+# xlsxwriter streams XML and is several times faster than openpyxl for plain data dumps
+XLSX_WRITE_ENGINE = "xlsxwriter" if importlib.util.find_spec("xlsxwriter") is not None else "openpyxl"
 
 warnings.filterwarnings('ignore', category=UserWarning)
 warnings.filterwarnings('ignore', category=FutureWarning)
 
-from drivers.driver_factory import make_driver
-driver = make_driver(download_dir="downloads", page_load_strategy="eager")
+# Patterns used per row/column, compiled once at import
+_GST_RE = re.compile(r"\b\d{2}[A-Z]{5}\d{4}[A-Z][A-Z0-9]Z[A-Z0-9]\b", re.I)
+_GST_GROUP_RE = re.compile(f"({_GST_RE.pattern})", re.I)  # capturing form for Series.str.extract
+_AMOUNT_STRIP_RE = re.compile(r"[^\d.-]")
+# Bytes to delete when normalising headers to [a-z0-9]; non-ASCII is dropped by the encode
+_NON_ALNUM_BYTES = bytes(b for b in range(256) if not (48 <= b <= 57 or 97 <= b <= 122))
+# Date layouts tried in order by _parse_date_column
+_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%Y/%m/%d")
+
+
+def _strftime_or_nan(value):
+    """value.strftime('%Y-%m-%d'), or NaN when the datetime-like cannot format itself"""
+    try:
+        return value.strftime("%Y-%m-%d")
+    except Exception:
+        return np.nan
+
+
+@lru_cache(maxsize=None)
+def _env(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Environment lookup resolved once per process (the environment is fixed for a run)"""
+    return os.getenv(name, default)
+
+
+def _files_by_suffix(directory, sizes: Optional[Dict[str, int]] = None) -> Dict[str, List[Path]]:
+    """One scandir pass over a directory: regular files grouped by lower-cased suffix, name-sorted.
+
+    If ``sizes`` is given it is filled with {str(path): st_size} from the same pass.
+    """
+    by_ext: Dict[str, List[Path]] = defaultdict(list)
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_file():
+                    path = Path(entry.path)
+                    by_ext[os.path.splitext(entry.name)[1].lower()].append(path)
+                    if sizes is not None:
+                        sizes[str(path)] = entry.stat().st_size
+    except FileNotFoundError:
+        pass
+    for paths in by_ext.values():
+        paths.sort()
+    return by_ext
+
+
+# Rows sampled when map_dataframe_columns judges how name-like / numeric a column is
+LENGTH_SAMPLE_ROWS = 1000
+NUMERIC_SAMPLE_ROWS = 2000
+
+# Header heuristics for map_dataframe_columns: exact names first, then synonym substrings
+_COLUMN_RULES: Dict[str, Dict[str, List[str]]] = {
+    "invoice_number": {
+        "exact": [
+            "invoice_number", "invoice number", "invoice_no", "invoice no",
+            "inv_no", "inv no", "inv_num", "inv#", "invoiceid", "voucherno",
+            "voucher_no", "doc_no", "document_no", "purchaseinvno",
+        ],
+        "syn": ["invoice", "inv", "voucher", "doc", "bill"],
+    },
+    "vendor": {
+        "exact": [
+            "vendor", "vendor_name", "vendor name", "supplier", "supplier_name",
+            "supplier name", "partyname", "party", "payee", "company", "beneficiary",
+        ],
+        "syn": ["vendor", "supplier", "party", "company", "payee", "beneficiary"],
+    },
+    "amount": {
+        "exact": [
+            "amount", "invoice_amount", "invoice amount", "total", "total_amount",
+            "grand_total", "net_amount", "gross_amount", "paytyamt", "taxablevalue",
+        ],
+        "syn": ["amount", "total", "grand", "value", "sum", "amt"],
+    },
+}
+
+_COLUMN_BAD_WORDS: Dict[str, set] = {
+    "invoice_number": {"date", "time", "entry", "created", "updated", "month", "year"},
+    "vendor": {"address", "gst", "pan", "state", "city", "country", "code", "id"},
+    "amount": {
+        "igst", "cgst", "sgst", "vat", "tax", "tds", "discount", "round", "roundoff",
+        "cess", "rate", "qty", "quantity", "price_per", "unit",
+    },
+}
+
+# One pass per header: the lookahead reports, at every offset, the first synonym starting there
+_COLUMN_SYN_RES = {
+    target: re.compile("(?=(" + "|".join(map(re.escape, rule["syn"])) + "))")
+    for target, rule in _COLUMN_RULES.items()
+}
+_COLUMN_BAD_RES = {
+    target: re.compile("|".join(map(re.escape, sorted(words))))
+    for target, words in _COLUMN_BAD_WORDS.items()
+}
+
+
+def _norm_key(s: str) -> str:
+    """Lower-case and keep only [a-z0-9]"""
+    return s.lower().encode("ascii", "ignore").translate(None, _NON_ALNUM_BYTES).decode("ascii")
+
+
+# Rule lookups flattened once: (lower-cased, normalised) exact names and synonym ranks per target
+_COLUMN_EXACT_KEYS = {
+    target: tuple((name.lower(), _norm_key(name)) for name in rule["exact"])
+    for target, rule in _COLUMN_RULES.items()
+}
+_COLUMN_SYN_RANKS = {
+    target: {syn: i for i, syn in enumerate(rule["syn"])}
+    for target, rule in _COLUMN_RULES.items()
+}
+
+
+@lru_cache(maxsize=128)
+def _column_name_matches(cols: Tuple[str, ...]) -> Dict[str, Tuple[Optional[str], Tuple[str, ...]]]:
+    """Name-only part of the column mapping, memoised per header schema.
+
+    For each target: (exact/normalised match or None, synonym candidates in rule order).
+    Files exported from the same report share headers, so this runs once per schema.
+    """
+    lowered = [c.lower() for c in cols]
+    cols_lower = dict(zip(lowered, cols))
+    norm_map = {_norm_key(c): c for c in cols}
+    matches: Dict[str, Tuple[Optional[str], Tuple[str, ...]]] = {}
+    for target, exact_keys in _COLUMN_EXACT_KEYS.items():
+        # exact lower, then exact normalized
+        exact = next((cols_lower[low] for low, _ in exact_keys if low in cols_lower), None)
+        if exact is None:
+            exact = next((norm_map[key] for _, key in exact_keys if key in norm_map), None)
+        ranked: List[Tuple[int, int, str]] = []
+        if exact is None:
+            # synonyms, ordered by earliest matching synonym then column position
+            rank = _COLUMN_SYN_RANKS[target]
+            syn_re, bad_re = _COLUMN_SYN_RES[target], _COLUMN_BAD_RES[target]
+            for pos, lc in enumerate(lowered):
+                hits = [rank[m.group(1)] for m in syn_re.finditer(lc)]
+                if hits and not bad_re.search(lc):
+                    ranked.append((min(hits), pos, cols[pos]))
+        matches[target] = (exact, tuple(c for _, _, c in sorted(ranked)))
+    return matches
+
+
+# Parallel HTTP GETs for invoice document links in the RMS download fallback
+DOC_DOWNLOAD_WORKERS = 8
+# Invoice documents accepted from those GETs: suffix -> leading magic bytes
+_DOC_SIGNATURES = {".pdf": b"%PDF", ".jpg": b"\xff\xd8\xff", ".jpeg": b"\xff\xd8\xff"}
+_DOC_CONTENT_SUFFIX = {"application/pdf": ".pdf", "image/jpeg": ".jpg", "image/jpg": ".jpg", "image/pjpeg": ".jpg"}
+
+
+def _document_file_name(url: str, content_disposition: Optional[str], content_type: str) -> str:
+    """File name for a fetched invoice document.
+
+    Content-Disposition wins; then the URL path if it already names a document; otherwise
+    the path stem plus a hash of the full URL, so query-string links never collide.
+    """
+    if content_disposition:
+        msg = Message()
+        msg["content-disposition"] = content_disposition
+        name = Path(msg.get_filename() or "").name
+        if name:
+            return name
+    name = unquote(Path(urlparse(url).path).name)
+    if os.path.splitext(name)[1].lower() in _DOC_SIGNATURES:
+        return name
+    suffix = _DOC_CONTENT_SUFFIX.get(content_type, "")
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=6).hexdigest()
+    return f"{os.path.splitext(name)[0] or 'document'}_{digest}{suffix}"
+
+# Below this many local files, reading them in worker processes costs more than it saves
+PARALLEL_FILES_MIN = 4
+
+
+# Rows handed to csv.writer.writerows at a time when exporting straight from the DB
+CSV_STREAM_BATCH = 10_000
+
+# Beyond this many rows the summary sheet keeps default column widths
+AUTOSIZE_MAX_ROWS = 100_000
+
+# Formats that are already DEFLATE/DCT compressed; re-deflating them burns CPU for ~0% gain
+_PRECOMPRESSED_SUFFIXES = frozenset({".xlsx", ".pdf", ".jpg", ".jpeg", ".png", ".zip", ".gz"})
+# Copy buffer for stored archive members (ZipFile.write reads 8 KiB at a time)
+ZIP_COPY_BUFFER = 1024 * 1024
+# build_invoices_zip: reader threads, files read ahead of the writer, and the largest
+# file worth holding in memory (bigger ones are streamed by the writer itself)
+ZIP_READ_WORKERS = 8
+ZIP_READ_AHEAD = 16
+ZIP_PREFETCH_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _zip_add(zf: zipfile.ZipFile, path, arcname: str) -> None:
+    """Add a file to an archive: stored if already compressed, fast deflate otherwise"""
+    if os.path.splitext(str(path))[1].lower() in _PRECOMPRESSED_SUFFIXES:
+        zinfo = zipfile.ZipInfo.from_file(path, arcname=arcname)
+        zinfo.compress_type = zipfile.ZIP_STORED
+        with open(path, "rb") as src, zf.open(zinfo, "w") as dst:
+            shutil.copyfileobj(src, dst, ZIP_COPY_BUFFER)
+    else:
+        zf.write(path, arcname=arcname, compress_type=zipfile.ZIP_DEFLATED, compresslevel=1)
+
 
 # Configuration with safe environment variable handling
 @dataclass
@@ -135,6 +350,9 @@ class Config:
     IS_GITHUB_ACTIONS: bool = os.getenv('GITHUB_ACTIONS', 'false').lower() == 'true'
     HEADLESS_MODE: bool = os.getenv('HEADLESS_MODE', 'true').lower() == 'true'
 
+    # SQLite: skip fsync entirely (synchronous=OFF) -- only for throwaway CI/ephemeral databases
+    SQLITE_UNSAFE_FAST: bool = os.getenv('SQLITE_UNSAFE_FAST', 'false').lower() == 'true'
+
     def __post_init__(self):
         """Post-initialization validation and warnings"""
         if self.IS_GITHUB_ACTIONS:
@@ -148,8 +366,8 @@ class Config:
             if not self.EMAIL_TO:
                 logger.warning("EMAIL_TO not configured - email notifications disabled")
 
-            rms_username = os.getenv('RMS_USERNAME')
-            rms_password = os.getenv('RMS_PASSWORD')
+            rms_username = _env('RMS_USERNAME')
+            rms_password = _env('RMS_PASSWORD')
             if not rms_username or not rms_password:
                 logger.warning("RMS credentials not configured - RMS integration disabled")
 
@@ -172,11 +390,17 @@ class LogManager:
         # Clear existing handlers
         root_logger.handlers.clear()
         
-        # Set root logger level
-        root_logger.setLevel(logging.DEBUG)
-        
-        # Define formatters
+        # Set root logger level; CI runs do not need DEBUG records built at all
+        root_logger.setLevel(logging.INFO if config.IS_GITHUB_ACTIONS else logging.DEBUG)
+
+        # No thread/process names in any format; skip collecting them per record
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+
+        # Define formatters (caller location only on the error log)
         simple_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
         detailed_formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
         )
@@ -187,15 +411,17 @@ class LogManager:
         console_handler.setFormatter(simple_formatter)
         root_logger.addHandler(console_handler)
 
+        today = datetime.now().strftime('%Y%m%d')
+
         # Main log file
-        main_log_file = self.log_dir / f"invoice_validation_{datetime.now().strftime('%Y%m%d')}.log"
+        main_log_file = self.log_dir / f"invoice_validation_{today}.log"
         file_handler = logging.FileHandler(main_log_file, encoding='utf-8')
         file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(detailed_formatter)
+        file_handler.setFormatter(file_formatter)
         root_logger.addHandler(file_handler)
 
         # Error log file
-        error_log_file = self.log_dir / f"errors_{datetime.now().strftime('%Y%m%d')}.log"
+        error_log_file = self.log_dir / f"errors_{today}.log"
         error_handler = logging.FileHandler(error_log_file, encoding='utf-8')
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(detailed_formatter)
@@ -212,131 +438,113 @@ class DatabaseManager:
         self.db_path = db_path or config.DB_PATH
         self.backup_path = config.BACKUP_DB_PATH
         self.logger = logging.getLogger(__name__)
+        # One long-lived connection per thread (PRAGMAs applied once each); see get_connection
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
         self.init_database()
 
+        # Processing-log rows are queued and written in batches by a background thread
+        self._log_queue: "queue.Queue[tuple]" = queue.Queue()
+        self._log_thread = threading.Thread(target=self._log_writer, name="db-log-writer", daemon=True)
+        self._log_thread.start()
+        atexit.register(self.flush)
+
+    # Whole schema in one script: one parse pass, one transaction
+    SCHEMA_SQL = """
+        BEGIN;
+
+        -- Enhanced invoice validation table with all required fields
+        CREATE TABLE IF NOT EXISTS invoice_validations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            invoice_number TEXT NOT NULL,
+            vendor_name TEXT,
+            amount REAL,
+            validation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'pending',
+            rms_status TEXT,
+            discrepancies TEXT,
+            notes TEXT,
+            file_path TEXT,
+            hash_value TEXT,
+            processed_by TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            -- New fields for enhanced reporting
+            gst_no TEXT DEFAULT '',
+            inv_date TEXT DEFAULT '',
+            inv_entry_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            inv_mod_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            due_date TEXT DEFAULT '',
+            scid_number TEXT DEFAULT '',
+            remarks TEXT DEFAULT '',
+            mop TEXT DEFAULT '',
+            account_head TEXT DEFAULT '',
+            inv_currency TEXT DEFAULT 'USD',
+            location TEXT DEFAULT '',
+            vendor_advance REAL DEFAULT 0.00,
+            marked_feedback_issue TEXT DEFAULT '',
+            tp_feedback_by_fm TEXT DEFAULT '',
+            ms_feedback_by_fm TEXT DEFAULT '',
+            fl_feedback TEXT DEFAULT '',
+            inv_created_by TEXT DEFAULT 'System'
+        );
+
+        -- Processing log table
+        CREATE TABLE IF NOT EXISTS processing_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            operation TEXT NOT NULL,
+            status TEXT NOT NULL,
+            message TEXT,
+            details TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- System settings table
+        CREATE TABLE IF NOT EXISTS system_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            description TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- Archive table
+        CREATE TABLE IF NOT EXISTS archived_invoices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            original_id INTEGER,
+            invoice_number TEXT NOT NULL,
+            vendor_name TEXT,
+            amount REAL,
+            validation_date TIMESTAMP,
+            status TEXT,
+            archive_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            archive_reason TEXT
+        );
+
+        -- Indexes for production performance
+        CREATE INDEX IF NOT EXISTS idx_invoice_number ON invoice_validations(invoice_number);
+        CREATE INDEX IF NOT EXISTS idx_validation_date ON invoice_validations(validation_date);
+        CREATE INDEX IF NOT EXISTS idx_status ON invoice_validations(status);
+        CREATE INDEX IF NOT EXISTS idx_gst_no ON invoice_validations(gst_no);
+        CREATE INDEX IF NOT EXISTS idx_vendor_name ON invoice_validations(vendor_name);
+        CREATE INDEX IF NOT EXISTS idx_session_logs ON processing_logs(session_id, timestamp);
+
+        COMMIT;
+        """
+
     def init_database(self):
         """Initialize production database with enhanced invoice validation table"""
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-
-                # Enhanced Invoice validation table with all required fields
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS invoice_validations (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        invoice_number TEXT NOT NULL,
-                        vendor_name TEXT,
-                        amount REAL,
-                        validation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        status TEXT DEFAULT 'pending',
-                        rms_status TEXT,
-                        discrepancies TEXT,
-                        notes TEXT,
-                        file_path TEXT,
-                        hash_value TEXT,
-                        processed_by TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        -- New fields for enhanced reporting
-                        gst_no TEXT DEFAULT '',
-                        inv_date TEXT DEFAULT '',
-                        inv_entry_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        inv_mod_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        due_date TEXT DEFAULT '',
-                        scid_number TEXT DEFAULT '',
-                        remarks TEXT DEFAULT '',
-                        mop TEXT DEFAULT '',
-                        account_head TEXT DEFAULT '',
-                        inv_currency TEXT DEFAULT 'USD',
-                        location TEXT DEFAULT '',
-                        vendor_advance REAL DEFAULT 0.00,
-                        marked_feedback_issue TEXT DEFAULT '',
-                        tp_feedback_by_fm TEXT DEFAULT '',
-                        ms_feedback_by_fm TEXT DEFAULT '',
-                        fl_feedback TEXT DEFAULT '',
-                        inv_created_by TEXT DEFAULT 'System'
-                    )
-                """)
-
-                # Processing log table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS processing_logs (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        session_id TEXT NOT NULL,
-                        operation TEXT NOT NULL,
-                        status TEXT NOT NULL,
-                        message TEXT,
-                        details TEXT,
-                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-
-                # System settings table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS system_settings (
-                        key TEXT PRIMARY KEY,
-                        value TEXT NOT NULL,
-                        description TEXT,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-
-                # Archive table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS archived_invoices (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        original_id INTEGER,
-                        invoice_number TEXT NOT NULL,
-                        vendor_name TEXT,
-                        amount REAL,
-                        validation_date TIMESTAMP,
-                        status TEXT,
-                        archive_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        archive_reason TEXT
-                    )
-                """)
-
-                # Create indexes for production performance
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_invoice_number
-                    ON invoice_validations(invoice_number)
-                """)
-
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_validation_date
-                    ON invoice_validations(validation_date)
-                """)
-
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_status
-                    ON invoice_validations(status)
-                """)
-
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_gst_no
-                    ON invoice_validations(gst_no)
-                """)
-
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_vendor_name
-                    ON invoice_validations(vendor_name)
-                """)
-
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_session_logs
-                    ON processing_logs(session_id, timestamp)
-                """)
-
-                conn.commit()
+                conn.executescript(self.SCHEMA_SQL)
                 self.logger.info("Enhanced production database initialized successfully")
 
         except Exception as e:
             self.logger.error(f"Database initialization failed: {e}")
             raise
 
-    def insert_invoice_validation_enhanced(self, invoice_data: Dict) -> int:
-        """Insert enhanced invoice validation record with all new fields"""
-        query = """
+    ENHANCED_INSERT_SQL = """
         INSERT INTO invoice_validations
         (invoice_number, vendor_name, amount, status, rms_status,
          discrepancies, notes, file_path, hash_value, processed_by,
@@ -345,7 +553,10 @@ class DatabaseManager:
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
 
-        params = (
+    @staticmethod
+    def _enhanced_params(invoice_data: Dict) -> tuple:
+        """Parameter tuple for ENHANCED_INSERT_SQL"""
+        return (
             invoice_data.get('invoice_number'),
             invoice_data.get('vendor_name'),
             invoice_data.get('amount'),
@@ -369,25 +580,58 @@ class DatabaseManager:
             invoice_data.get('inv_created_by', 'System')
         )
 
+    def insert_invoice_validation_enhanced(self, invoice_data: Dict) -> int:
+        """Insert enhanced invoice validation record with all new fields"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(query, params)
+                cursor.execute(self.ENHANCED_INSERT_SQL, self._enhanced_params(invoice_data))
                 conn.commit()
                 return cursor.lastrowid
         except Exception as e:
             self.logger.error(f"Failed to insert enhanced invoice validation: {e}")
             raise
 
+    # Rows per executemany call; bounds the parameter tuples alive at once
+    BULK_INSERT_CHUNK = 1000
+
+    def insert_invoice_validations_bulk(self, records: Iterable[Dict]) -> int:
+        """Insert many enhanced records in one transaction (one commit); returns rows inserted"""
+        params = map(self._enhanced_params, records)
+        inserted = 0
+
+        try:
+            with self.get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                while True:
+                    chunk = list(islice(params, self.BULK_INSERT_CHUNK))
+                    if not chunk:
+                        break
+                    cursor.executemany(self.ENHANCED_INSERT_SQL, chunk)
+                    inserted += cursor.rowcount
+                conn.commit()
+                return inserted
+        except Exception as e:
+            self.logger.error(f"Failed to bulk insert invoice validations after {inserted} rows: {e}")
+            raise
+
+    # Bump whenever migrate_database_schema learns a new column/index
+    SCHEMA_VERSION = 1
+
     def migrate_database_schema(self):
         """Migrate existing database to include new fields"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
+
+                # Already migrated to this version: nothing to inspect
+                if cursor.execute("PRAGMA user_version").fetchone()[0] >= self.SCHEMA_VERSION:
+                    return
             
                 # Check if new columns exist, if not add them
                 cursor.execute("PRAGMA table_info(invoice_validations)")
-                existing_columns = [row[1] for row in cursor.fetchall()]
+                existing_columns = {row[1] for row in cursor.fetchall()}
             
                 new_columns = {
                     'gst_no': 'TEXT DEFAULT ""',
@@ -409,49 +653,84 @@ class DatabaseManager:
                     'inv_created_by': 'TEXT DEFAULT "System"'
                 }
             
-                for column_name, column_definition in new_columns.items():
-                    if column_name not in existing_columns:
+                # Column names are dynamic, so ALTERs stay separate -- but share one transaction
+                missing = [(name, definition) for name, definition in new_columns.items()
+                           if name not in existing_columns]
+                if missing:
+                    cursor.execute("BEGIN")
+                    for column_name, column_definition in missing:
                         cursor.execute(f"ALTER TABLE invoice_validations ADD COLUMN {column_name} {column_definition}")
-                        self.logger.info(f"Added column: {column_name}")
+                    conn.commit()
+                    self.logger.info(f"Added columns: {', '.join(name for name, _ in missing)}")
             
                 # Create new indexes if they don't exist
                 try:
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_gst_no ON invoice_validations(gst_no)")
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vendor_name ON invoice_validations(vendor_name)")
+                    conn.executescript("""
+                        CREATE INDEX IF NOT EXISTS idx_gst_no ON invoice_validations(gst_no);
+                        CREATE INDEX IF NOT EXISTS idx_vendor_name ON invoice_validations(vendor_name);
+                    """)
                 except Exception as e:
                     self.logger.debug(f"Index creation skipped: {e}")
-            
-                conn.commit()
+
+                cursor.execute(f"PRAGMA user_version = {int(self.SCHEMA_VERSION)}")
                 self.logger.info("Database schema migration completed successfully")
             
         except Exception as e:
             self.logger.error(f"Database migration failed: {e}")
             raise
 
-    @contextmanager
-    def get_connection(self):
-        """Get database connection with production-grade error handling"""
-        conn = None
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection and apply the session PRAGMAs"""
+        # Used only by the thread that opened it; close() may close it from another thread
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30.0,
+            check_same_thread=False
+        )
         try:
-            conn = sqlite3.connect(
-                self.db_path,
-                timeout=30.0,
-                check_same_thread=False
-            )
             conn.row_factory = sqlite3.Row
             conn.execute("PRAGMA foreign_keys = ON")
             conn.execute("PRAGMA journal_mode = WAL")
-            conn.execute("PRAGMA synchronous = NORMAL")
-            conn.execute("PRAGMA cache_size = 10000")
+            conn.execute("PRAGMA synchronous = OFF" if config.SQLITE_UNSAFE_FAST else "PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA cache_size = -65536")  # 64 MiB (negative = KiB)
+            conn.execute("PRAGMA temp_store = MEMORY")
+            conn.execute("PRAGMA mmap_size = 268435456")  # 256 MiB
+            conn.execute("PRAGMA wal_autocheckpoint = 10000")  # fewer checkpoints mid-batch
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    @contextmanager
+    def get_connection(self):
+        """
+        Get the calling thread's connection with production-grade error handling.
+
+        Every thread (main, db-log-writer, report pool workers) gets its own connection,
+        so one caller's transaction never sees another's statements. WAL lets readers run
+        alongside the single writer; competing writers wait on the 30 s busy timeout.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        try:
             yield conn
         except Exception as e:
-            if conn:
-                conn.rollback()
+            conn.rollback()
             self.logger.error(f"Database connection error: {e}")
             raise
-        finally:
-            if conn:
+
+    def close(self):
+        """Close every thread's connection (checkpoints the WAL); reopened on next use"""
+        self.flush()
+        with self._conns_lock:
+            for conn in self._conns:
                 conn.close()
+            self._conns.clear()
+            self._local = threading.local()
 
     def backup_database(self) -> bool:
         """Create production database backup"""
@@ -461,8 +740,22 @@ class DatabaseManager:
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 timestamped_backup = f"backup_invoice_validation_{timestamp}.db"
 
-                shutil.copy2(self.db_path, self.backup_path)
-                shutil.copy2(self.db_path, timestamped_backup)
+                # Online backup API: consistent with the WAL, streamed page by page.
+                # Write to a temp file and swap it in so earlier hardlinks keep their content.
+                tmp_backup = f"{self.backup_path}.tmp"
+                with self.get_connection() as conn:
+                    dest = sqlite3.connect(tmp_backup)
+                    try:
+                        conn.backup(dest)
+                    finally:
+                        dest.close()
+                os.replace(tmp_backup, self.backup_path)
+
+                # Timestamped copy is a second name for the same file; copy across devices
+                try:
+                    os.link(self.backup_path, timestamped_backup)
+                except OSError:
+                    shutil.copy2(self.backup_path, timestamped_backup)
 
                 self.logger.info(f"Database backed up to {self.backup_path} and {timestamped_backup}")
                 return True
@@ -482,7 +775,13 @@ class DatabaseManager:
                     cursor.execute(query)
 
                 if query.strip().upper().startswith('SELECT'):
-                    return [dict(row) for row in cursor.fetchall()]
+                    cursor.arraysize = 1000
+                    rows: List[Dict] = []
+                    while True:
+                        batch = cursor.fetchmany()
+                        if not batch:
+                            return rows
+                        rows.extend(map(dict, batch))
                 else:
                     conn.commit()
                     return [{'affected_rows': cursor.rowcount}]
@@ -491,15 +790,64 @@ class DatabaseManager:
             self.logger.error(f"Query execution failed: {query[:100]}... Error: {e}")
             raise
 
-    def insert_invoice_validation(self, invoice_data: Dict) -> int:
-        """Insert invoice validation record with production validation"""
-        query = """
+    @contextmanager
+    def _stream_connection(self):
+        """
+        Short-lived read-only connection for results consumed lazily by the caller.
+        A half-consumed stream then pins only its own WAL snapshot, never a thread's
+        long-lived connection.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA query_only = ON")
+            yield conn
+        finally:
+            conn.close()
+
+    def iter_query(self, query: str, params: tuple = None):
+        """
+        Yield sqlite3.Row objects, fetched 1000 at a time, instead of building a list of dicts.
+        Runs on its own connection, closed when the generator is exhausted or closed.
+        """
+        try:
+            with self._stream_connection() as conn:
+                cursor = conn.execute(query, params or ())
+                cursor.arraysize = 1000
+                while True:
+                    batch = cursor.fetchmany()
+                    if not batch:
+                        return
+                    yield from batch
+        except Exception as e:
+            self.logger.error(f"Query iteration failed: {query[:100]}... Error: {e}")
+            raise
+
+    def read_df(self, query: str, params: tuple = None, chunksize: Optional[int] = None):
+        """
+        Load a query straight into pandas (columnar build from the cursor, no list of dicts).
+        With chunksize, returns an iterator of DataFrames read on its own connection.
+        """
+        if chunksize:
+            return self._iter_df(query, params, chunksize)
+        with self.get_connection() as conn:
+            return pd.read_sql_query(query, conn, params=params or ())
+
+    def _iter_df(self, query: str, params: tuple, chunksize: int):
+        with self._stream_connection() as conn:
+            yield from pd.read_sql_query(query, conn, params=params or (), chunksize=chunksize)
+
+    # Fixed statement text so the connection's statement cache parses it once
+    BASIC_INSERT_SQL = """
         INSERT INTO invoice_validations
         (invoice_number, vendor_name, amount, status, rms_status,
          discrepancies, notes, file_path, hash_value, processed_by)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
 
+    def insert_invoice_validation(self, invoice_data: Dict) -> int:
+        """Insert invoice validation record with production validation"""
+
         params = (
             invoice_data.get('invoice_number'),
             invoice_data.get('vendor_name'),
@@ -516,28 +864,51 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(query, params)
+                cursor.execute(self.BASIC_INSERT_SQL, params)
                 conn.commit()
                 return cursor.lastrowid
         except Exception as e:
             self.logger.error(f"Failed to insert invoice validation: {e}")
             raise
 
-    def log_processing_event(self, session_id: str, operation: str,
-                           status: str, message: str = None, details: str = None):
-        """Log processing event with production metadata"""
-        query = """
-        INSERT INTO processing_logs (session_id, operation, status, message, details)
-        VALUES (?, ?, ?, ?, ?)
+    LOG_INSERT_SQL = """
+        INSERT INTO processing_logs (session_id, operation, status, message, details, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
         """
 
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, (session_id, operation, status, message, details))
-                conn.commit()
-        except Exception as e:
-            self.logger.error(f"Failed to log processing event: {e}")
+    def log_processing_event(self, session_id: str, operation: str,
+                           status: str, message: str = None, details: Any = None):
+        """Queue a processing event; the writer thread persists it (UTC timestamp taken now)"""
+        if details is not None and not isinstance(details, str):
+            details = _dumps(details)
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        self._log_queue.put((session_id, operation, status, message, details, timestamp))
+
+    def _log_writer(self):
+        """Drain the log queue: block for one event, take whatever else is pending, one commit"""
+        while True:
+            rows = [self._log_queue.get()]
+            while len(rows) < config.BATCH_SIZE:
+                try:
+                    rows.append(self._log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self.get_connection() as conn:
+                    conn.executemany(self.LOG_INSERT_SQL, rows)
+                    conn.commit()
+            except Exception as e:
+                self.logger.error(f"Failed to log {len(rows)} processing event(s): {e}")
+            finally:
+                for _ in rows:
+                    self._log_queue.task_done()
+
+    def flush(self):
+        """Block until every queued processing event has been written"""
+        self._log_queue.join()
+
+# URL patterns the RMS browser session never needs to fetch
+BLOCKED_ASSET_URLS = ["*.woff", "*.woff2", "*.ttf", "*analytics*", "*googletagmanager*", "*doubleclick*"]
 
 class ProductionSeleniumManager:
     """Creates a Chrome WebDriver configured for GitHub Actions / headless."""
@@ -549,6 +920,8 @@ class ProductionSeleniumManager:
         self.setup_chrome_options()
 
     def setup_chrome_options(self) -> None:
+        from selenium.webdriver.chrome.options import Options
+
         options = Options()
         # Hardened flags
         options.add_argument("--no-sandbox")
@@ -578,6 +951,8 @@ class ProductionSeleniumManager:
             "plugins.always_open_pdf_externally": True,  # force PDF download, not viewer
             "profile.default_content_settings.popups": 0,
             "profile.default_content_setting_values.notifications": 2,
+            # Don't render page images; file downloads (PDF/JPG invoices) are unaffected
+            "profile.managed_default_content_settings.images": 2,
         }
         options.add_experimental_option("prefs", prefs)
         options.add_experimental_option("excludeSwitches", ["enable-logging"])
@@ -585,12 +960,6 @@ class ProductionSeleniumManager:
 
         # 👈 This line was missing
         self.options = options
-        
-        # Strongly recommended for CI:
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--window-size=1920,1080")
 
     def get_driver(self):
         """Create (or return cached) driver (uses Selenium Manager)."""
@@ -599,6 +968,8 @@ class ProductionSeleniumManager:
 
         # Let Selenium Manager pick a compatible driver for the installed Chrome.
         # (No Service / chromedriver path required.)
+        from selenium import webdriver
+
         self.driver = webdriver.Chrome(options=self.options)
 
         try:
@@ -606,6 +977,14 @@ class ProductionSeleniumManager:
             self.driver.set_page_load_timeout(timeout)
         except Exception:
             pass
+
+        # Skip fonts and analytics on every navigation (explicit waits are used throughout,
+        # so no implicit wait is set). Image URLs stay unblocked: invoice JPGs are downloads.
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_ASSET_URLS})
+        except Exception as e:
+            self.logger.debug(f"Asset blocking not enabled: {e}")
         return self.driver
         
     def quit(self) -> None:
@@ -616,6 +995,53 @@ class ProductionSeleniumManager:
         finally:
             self.driver = None
 
+class ProcessingSummary:
+    """Processing statistics; the email text is only rendered on first access"""
+
+    def __init__(self, session_id: str, statistics: Dict, email_enabled: bool = False):
+        self.session_id = session_id
+        self.statistics = statistics
+        self.email_enabled = email_enabled
+
+    @cached_property
+    def details_json(self) -> str:
+        return _dumps(self.statistics)
+
+    @cached_property
+    def text_summary(self) -> str:
+        stats = self.statistics
+        return f"""
+Production Invoice Validation System - Processing Summary
+========================================================
+
+Session ID: {self.session_id}
+Processing Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Environment: {'GitHub Actions' if config.IS_GITHUB_ACTIONS else 'Local'}
+
+SUMMARY STATISTICS:
+- Total Invoices Processed: {stats.get('total_processed', 0)}
+- Successful Validations: {stats.get('successful', 0)}
+- Failed Validations: {stats.get('failed', 0)}
+- Discrepancies Found: {stats.get('discrepancies', 0)}
+
+OVERALL STATUS: {'SUCCESS' if stats.get('overall_status') == 'success' else 'FAILED'}
+
+CONFIGURATION:
+- RMS Integration: {'Enabled' if _env('RMS_USERNAME') else 'Disabled'}
+- Email Notifications: {'Enabled' if self.email_enabled else 'Disabled'}
+- Database: SQLite with backup enabled
+- File Processing: Multiple formats supported
+
+DETAILS:
+{self.details_json}
+
+Best regards,
+Production Invoice Validation System
+"""
+
+# Multiple of 57 bytes so each base64 chunk ends on a full 76-char line
+ATTACHMENT_CHUNK_SIZE = 57 * 1024
+
 class ProductionEmailNotifier:
     """Production email notification system"""
 
@@ -635,44 +1061,16 @@ class ProductionEmailNotifier:
 
     def send_processing_summary(self, session_id: str, processing_results: Dict) -> bool:
         """Send production processing summary email"""
+        summary = ProcessingSummary(session_id, processing_results, self.email_configured)
+
         if not self.email_configured:
             self.logger.info("Email not configured - logging summary instead")
-            self.logger.info(f"Processing Summary: {json.dumps(processing_results, indent=2, default=str)}")
+            self.logger.info(f"Processing Summary: {summary.details_json}")
             return True
 
         try:
             subject = f"Invoice Validation Report - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
 
-            # Create comprehensive text body
-            text_body = f"""
-Production Invoice Validation System - Processing Summary
-========================================================
-
-Session ID: {session_id}
-Processing Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Environment: {'GitHub Actions' if config.IS_GITHUB_ACTIONS else 'Local'}
-
-SUMMARY STATISTICS:
-- Total Invoices Processed: {processing_results.get('total_processed', 0)}
-- Successful Validations: {processing_results.get('successful', 0)}
-- Failed Validations: {processing_results.get('failed', 0)}
-- Discrepancies Found: {processing_results.get('discrepancies', 0)}
-
-OVERALL STATUS: {'SUCCESS' if processing_results.get('overall_status') == 'success' else 'FAILED'}
-
-CONFIGURATION:
-- RMS Integration: {'Enabled' if os.getenv('RMS_USERNAME') else 'Disabled'}
-- Email Notifications: {'Enabled' if self.email_configured else 'Disabled'}
-- Database: SQLite with backup enabled
-- File Processing: Multiple formats supported
-
-DETAILS:
-{json.dumps(processing_results, indent=2, default=str)}
-
-Best regards,
-Production Invoice Validation System
-"""
-
             # Get recipients
             to_emails = config.EMAIL_TO.split(',') if config.EMAIL_TO else []
             cc_emails = config.EMAIL_CC.split(',') if config.EMAIL_CC else []
@@ -687,7 +1085,7 @@ Production Invoice Validation System
             return self.send_email(
                 to_emails=to_emails,
                 subject=subject,
-                body_text=text_body,
+                body_text=summary.text_summary,
                 cc_emails=cc_emails,
                 attachments=attachments
             )
@@ -696,63 +1094,96 @@ Production Invoice Validation System
             self.logger.error(f"Failed to send production processing summary: {e}")
             return False
 
+    @contextmanager
+    def _smtp_session(self):
+        """Yield a connected, logged-in SMTP session (one TLS handshake per batch)"""
+        if self.smtp_port == 465:
+            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port)
+        else:
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+            server.starttls()
+        try:
+            server.login(self.username, self.password)
+            yield server
+        finally:
+            try:
+                server.quit()
+            except smtplib.SMTPException:
+                server.close()
+
+    @staticmethod
+    def _split_emails(emails: Union[str, List[str], None]) -> List[str]:
+        if not emails:
+            return []
+        if isinstance(emails, str):
+            return [email.strip() for email in emails.split(',')]
+        return list(emails)
+
+    def _build_message(self, to_emails: List[str], subject: str, body_text: str,
+                       body_html: str = None, cc_emails: List[str] = None,
+                       attachments: List[str] = None) -> MIMEMultipart:
+        """Assemble a MIME message with optional HTML body and attachments"""
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.from_email
+        msg['To'] = ', '.join(to_emails)
+        msg['Subject'] = subject
+
+        if cc_emails:
+            msg['Cc'] = ', '.join(cc_emails)
+
+        # Add text part
+        text_part = MIMEText(body_text, 'plain', 'utf-8')
+        msg.attach(text_part)
+
+        # Add HTML part if provided
+        if body_html:
+            html_part = MIMEText(body_html, 'html', 'utf-8')
+            msg.attach(html_part)
+
+        # Add attachments
+        if attachments:
+            for attachment in attachments:
+                if os.path.exists(attachment):
+                    part = self._attachment_part(attachment)
+                    filename = os.path.basename(attachment)
+                    part.add_header(
+                        'Content-Disposition',
+                        f'attachment; filename= {filename}'
+                    )
+                    msg.attach(part)
+                    self.logger.info(f"Added attachment: {filename}")
+
+        return msg
+
+    @staticmethod
+    def _attachment_part(path: str) -> MIMEBase:
+        """Base64-encode an attachment chunk by chunk so the raw file and its
+        encoded form are never both held in memory"""
+        part = MIMEBase('application', 'octet-stream')
+        encoded = []
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(ATTACHMENT_CHUNK_SIZE), b''):
+                encoded.append(base64.encodebytes(chunk).decode('ascii'))
+        part.set_payload(''.join(encoded))
+        part['Content-Transfer-Encoding'] = 'base64'
+        return part
+
     def send_email(self, to_emails: Union[str, List[str]], subject: str,
                   body_text: str, body_html: str = None,
                   cc_emails: Union[str, List[str]] = None,
                   attachments: List[str] = None) -> bool:
         """Send production email with comprehensive error handling"""
         try:
-            # Normalize email lists
-            if isinstance(to_emails, str):
-                to_emails = [email.strip() for email in to_emails.split(',')]
+            to_emails = self._split_emails(to_emails)
+            cc_emails = self._split_emails(cc_emails)
 
-            if cc_emails:
-                if isinstance(cc_emails, str):
-                    cc_emails = [email.strip() for email in cc_emails.split(',')]
-            else:
-                cc_emails = []
-
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.from_email
-            msg['To'] = ', '.join(to_emails)
-            msg['Subject'] = subject
-
-            if cc_emails:
-                msg['Cc'] = ', '.join(cc_emails)
-
-            # Add text part
-            text_part = MIMEText(body_text, 'plain', 'utf-8')
-            msg.attach(text_part)
-
-            # Add HTML part if provided
-            if body_html:
-                html_part = MIMEText(body_html, 'html', 'utf-8')
-                msg.attach(html_part)
-
-            # Add attachments
-            if attachments:
-                for attachment in attachments:
-                    if os.path.exists(attachment):
-                        with open(attachment, 'rb') as f:
-                            part = MIMEBase('application', 'octet-stream')
-                            part.set_payload(f.read())
-
-                        encoders.encode_base64(part)
-                        filename = os.path.basename(attachment)
-                        part.add_header(
-                            'Content-Disposition',
-                            f'attachment; filename= {filename}'
-                        )
-                        msg.attach(part)
-                        self.logger.info(f"Added attachment: {filename}")
+            msg = self._build_message(to_emails, subject, body_text, body_html,
+                                      cc_emails, attachments)
 
             # Send email
             all_recipients = to_emails + cc_emails
 
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.username, self.password)
+            with self._smtp_session() as server:
                 server.send_message(msg, to_addrs=all_recipients)
 
             self.logger.info(f"Production email sent successfully to {len(all_recipients)} recipients")
@@ -762,19 +1193,572 @@ Production Invoice Validation System
             self.logger.error(f"Failed to send production email: {e}")
             return False
 
-class ProductionInvoiceValidationSystem:
+    def send_emails(self, messages: List[Tuple[Union[str, List[str]], str, str]]) -> int:
+        """Send a batch of (to, subject, body_text) mails over one SMTP session.
+
+        Returns the number of messages delivered.
+        """
+        if not messages:
+            return 0
+
+        sent = 0
+        try:
+            with self._smtp_session() as server:
+                for to_emails, subject, body_text in messages:
+                    to_emails = self._split_emails(to_emails)
+                    msg = self._build_message(to_emails, subject, body_text)
+                    try:
+                        server.send_message(msg, to_addrs=to_emails)
+                        sent += 1
+                    except smtplib.SMTPException as e:
+                        self.logger.error(f"Failed to send email to {', '.join(to_emails)}: {e}")
+        except Exception as e:
+            self.logger.error(f"Failed to open SMTP session for batch send: {e}")
+
+        self.logger.info(f"Batch email send complete: {sent}/{len(messages)} delivered")
+        return sent
+
+class LocalFileProcessor:
+    """
+    Per-file pipeline: read, clean, validate and build invoice records for one local file.
+
+    Needs only the session id, the RMS and memory-stats switches and a logger, and never
+    touches the database, email or browser, so worker processes construct it directly.
+    """
+
+    def __init__(self, session_id: str, rms_enabled: bool = False, deep_stats: bool = False,
+                 logger: Optional[logging.Logger] = None):
+        self.session_id = session_id
+        # Only labels records' rms_status here; the browser lives on the orchestrator
+        self.rms_enabled = rms_enabled
+        # deep=True memory stats walk every string object; opt-in only
+        self._deep_stats = deep_stats
+        self.logger = logger or logging.getLogger(__name__)
+
+    def prepare_local_file(self, file_path: Path) -> Dict[str, Any]:
+        """Read, clean and validate one file and build its invoice records (no database access).
+
+        Returns {'validation': ..., 'records': [...]}; 'validation' is None when the file could
+        not be read, and 'error' carries the message of any unexpected failure.
+        """
+        try:
+            self.logger.info(f"Processing production file: {file_path}")
+            df = self.read_local_file(file_path)
+            if df is None:
+                return {'validation': None, 'records': []}
+
+            # Clean and validate data
+            df = self.clean_dataframe(df)
+            validation_results = self.validate_invoice_data(df)
+
+            records: List[Dict] = []
+            if validation_results['valid']:
+                try:
+                    records = self.build_invoice_records(df, str(file_path))
+                except Exception as e:
+                    self.logger.error(f"DataFrame processing failed: {e}")
+            return {'validation': validation_results, 'records': records}
+        except Exception as e:
+            return {'error': str(e)}
+
+    def read_local_file(self, file_path: Path) -> Optional[pd.DataFrame]:
+        """Load a CSV/TSV/TXT or spreadsheet into a DataFrame; None if no reader could open it"""
+        # Process file with encoding detection
+        if file_path.suffix.lower() in ['.csv', '.tsv', '.txt']:
+            delimiter = '\t' if file_path.suffix.lower() == '.tsv' else ','
+            try:
+                # Most exports are UTF-8: multithreaded pyarrow parser, no sniffing, and
+                # Arrow-backed columns (contiguous UTF-8 buffers instead of a str per cell)
+                df = pd.read_csv(file_path, engine='pyarrow', dtype_backend='pyarrow', delimiter=delimiter)
+                # pyarrow types non-UTF-8 text columns as binary instead of raising
+                import pyarrow as pa
+                for col, dtype in df.dtypes.items():
+                    if isinstance(dtype, pd.ArrowDtype) and pa.types.is_binary(dtype.pyarrow_dtype):
+                        raise UnicodeDecodeError("utf-8", b"", 0, 1, f"column {col!r} is not UTF-8")
+            except (UnicodeDecodeError, ValueError, ImportError) as e:
+                # pyarrow missing or rejected the file: C parser, still UTF-8 first
+                self.logger.debug(f"pyarrow CSV read failed for {file_path.name}: {e}")
+                try:
+                    df = pd.read_csv(file_path, encoding='utf-8', delimiter=delimiter)
+                except UnicodeDecodeError:
+                    # Only genuinely non-UTF-8 files pay for detection, on a small sample
+                    import chardet
+                    with open(file_path, 'rb') as f:
+                        encoding = chardet.detect(f.read(4096))['encoding'] or 'latin-1'
+                    df = pd.read_csv(file_path, encoding=encoding, delimiter=delimiter)
+            return df
+
+        # Excel files
+        try:
+            # Try smart_read_table first
+            return fr.smart_read_table(file_path)
+        except Exception as e:
+            self.logger.warning(f"smart_read_table failed: {e}, trying pandas directly")
+            try:
+                # Fallback to pandas (calamine first when installed)
+                if fr.CALAMINE_OK:
+                    return pd.read_excel(file_path, engine='calamine')
+                elif file_path.suffix.lower() == '.xls':
+                    return pd.read_excel(file_path, engine='xlrd')
+                else:
+                    return pd.read_excel(file_path, engine='openpyxl')
+            except Exception as e2:
+                self.logger.error(f"Failed to process {os.path.basename(file_path)}: {e2}")
+                return None
+
+    def clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Clean and standardize dataframe for production use."""
+        try:
+            original_shape = df.shape
+
+            # Remove completely empty rows and columns
+            df = df.dropna(how="all").dropna(axis=1, how="all")
+
+            # Standardize column names
+            df.columns = [
+                str(col).strip().lower().replace(" ", "_").replace("-", "_")
+                for col in df.columns
+            ]
+
+            # Remove duplicate columns
+            df = df.loc[:, ~df.columns.duplicated()]
+
+            # Clean string/object columns: strip, then blank out null-ish text in one mask.
+            # String dtypes (incl. Arrow-backed) are stripped in place and keep their backing.
+            text_cols = df.select_dtypes(include=["object", "string"]).columns
+            if len(text_cols):
+                stripped = df[text_cols].apply(
+                    lambda s: (s if pd.api.types.is_string_dtype(s.dtype) and s.dtype != object else s.astype(str)).str.strip()
+                )
+                df[text_cols] = stripped.mask(stripped.isin(["nan", "None", ""]))
+
+            cleaned_shape = df.shape
+            self.logger.info(f"DataFrame cleaned: {original_shape} -> {cleaned_shape}")
+            return df
+
+        except Exception as e:
+            self.logger.error(f"DataFrame cleaning failed: {e}")
+            return df
+
+    def validate_invoice_data(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Validate invoice data structure and content for production"""
+        validation_results = {'valid': True, 'errors': [], 'warnings': [], 'statistics': {}}
+        try:
+            required_patterns = {
+                'invoice_number': ['invoice', 'inv_no', 'number', 'inv_num'],
+                'vendor': ['vendor', 'supplier', 'company'],
+                'amount': ['amount', 'total', 'value', 'sum', 'price']
+            }
+            found_columns = {}
+            lowered = [(col, str(col).lower()) for col in df.columns]
+            for req_col, patterns in required_patterns.items():
+                match = next((col for col, lc in lowered if any(p in lc for p in patterns)), None)
+                if match is not None:
+                    found_columns[req_col] = match
+                else:
+                    validation_results['warnings'].append(f"Recommended column pattern not found: {req_col}")
+
+            if found_columns.get('invoice_number'):
+                invoice_numbers = df[found_columns['invoice_number']]
+                empty_invoices = int(pd.isna(invoice_numbers.to_numpy()).sum())
+                # duplicated().sum() == rows - distinct values (NaN counted as one value)
+                duplicate_invoices = len(invoice_numbers) - invoice_numbers.nunique(dropna=False)
+                if empty_invoices > 0:
+                    validation_results['warnings'].append(f"{empty_invoices} rows with empty invoice numbers")
+                if duplicate_invoices > 0:
+                    validation_results['warnings'].append(f"{duplicate_invoices} duplicate invoice numbers")
+
+            if found_columns.get('amount'):
+                amount_col = found_columns['amount']
+                try:
+                    # One float buffer, both counts taken from it
+                    amounts = pd.to_numeric(df[amount_col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                    invalid_mask = np.isnan(amounts)
+                    invalid_amounts = int(invalid_mask.sum())
+                    negative_amounts = int((amounts[~invalid_mask] < 0).sum())
+                    if invalid_amounts > 0:
+                        validation_results['warnings'].append(f"{invalid_amounts} rows with invalid amounts")
+                    if negative_amounts > 0:
+                        validation_results['warnings'].append(f"{negative_amounts} rows with negative amounts")
+                except Exception as e:
+                    validation_results['warnings'].append(f"Amount validation error: {e}")
+
+            mu = int(df.memory_usage(deep=self._deep_stats).sum())
+            validation_results['statistics'] = {
+                'total_rows': len(df),
+                'total_columns': len(df.columns),
+                'found_columns': found_columns,
+                'memory_usage': mu,
+                'file_size_estimate': f"{mu / 1024:.2f} KB"
+            }
+            self.logger.info(f"Production validation completed: {validation_results['statistics']}")
+        except Exception as e:
+            validation_results['valid'] = False
+            validation_results['errors'].append(f"Validation process failed: {e}")
+            self.logger.error(f"Invoice data validation failed: {e}")
+        return validation_results
+
+    def build_invoice_records(self, df: pd.DataFrame, source_file: str) -> List[Dict]:
+        """Invoice records (enhanced insert dicts) for every usable row; no database access."""
+        column_mapping = self.map_dataframe_columns(df)
+        if df.empty:
+            return []
+        aux = self.map_auxiliary_columns(df)
+
+        invoice_number_col = column_mapping.get("invoice_number")
+        vendor_col = column_mapping.get("vendor")
+        amount_col = column_mapping.get("amount")
+
+        if invoice_number_col in df.columns:
+            invoice_numbers = self._as_text(df[invoice_number_col])
+        else:
+            invoice_numbers = pd.Series("AUTO_" + df.index.astype(str), index=df.index)
+        if vendor_col in df.columns:
+            vendor_names = self._as_text(df[vendor_col])
+        else:
+            vendor_names = pd.Series("Unknown Vendor", index=df.index)
+        if amount_col in df.columns:
+            amounts = self.parse_amount_column(df[amount_col])
+        else:
+            amounts = pd.Series(np.nan, index=df.index)
+
+        out = pd.DataFrame({
+            "invoice_number": invoice_numbers,
+            "vendor_name": vendor_names,
+            "amount": amounts.astype(object).where(amounts.notna(), None),
+            "status": "processed",
+            "rms_status": "pending" if self.rms_enabled else "n/a",
+            "file_path": source_file,
+            "hash_value": self.calculate_row_hashes(df),
+            "processed_by": f"production_{self.session_id}",
+            "discrepancies": self.check_discrepancies_frame(df, column_mapping, amounts),
+            "notes": f"Processed in production mode at {datetime.now().isoformat()}",
+            # extended fields; a failing extractor blanks its own column, not the frame
+            "gst_no": self._extract_or_default("gst_no", df, "",
+                                               self.extract_gst_numbers, df, aux["gst"], column_mapping),
+            "inv_date": self._extract_or_default("inv_date", df, "", self._first_date, df, aux["inv_date"]),
+            "due_date": self._extract_or_default("due_date", df, "", self._first_date, df, aux["due_date"]),
+            "currency": self._extract_or_default("currency", df, "USD", self._first_text, df, aux["currency"],
+                                                 "USD", True),
+            "location": self._extract_or_default("location", df, "", self._first_text, df, aux["location"]),
+            "mop": self._extract_or_default("mop", df, "", self._first_text, df, aux["mop"]),
+            "account_head": self._extract_or_default("account_head", df, "",
+                                                     self._first_text, df, aux["account_head"]),
+        }, index=df.index)
+
+        keep = invoice_numbers.ne("") & invoice_numbers.str.lower().ne("nan")
+        skipped = int((~keep).sum())
+        if skipped:
+            self.logger.warning(f"Skipped {skipped} row(s) without an invoice number in {source_file}")
+        records: List[Dict] = out[keep].to_dict("records")
+        for rec in records[:5]:
+            self.logger.debug(f"Processed invoice: {rec['invoice_number']}")
+
+        return records
+
+    # ----------------------- Extraction helpers (column-wise) -----------------------
+
+    def _extract_or_default(self, field: str, df: pd.DataFrame, default: str, func, *args) -> pd.Series:
+        """func(*args), or `default` for every row if the extractor fails."""
+        try:
+            return func(*args)
+        except Exception as e:
+            self.logger.warning(f"{field} extraction failed for {len(df)} row(s): {e}")
+            return pd.Series(default, index=df.index, dtype=object)
+
+    @staticmethod
+    def _as_text(series: pd.Series) -> pd.Series:
+        """str(value).strip() for a whole column (missing values become 'nan', as str() would)."""
+        return series.astype(str).where(series.notna(), "nan").str.strip()
+
+    # Header keywords for the auxiliary fields; a column matches if its lower-cased name contains one
+    AUX_FIELD_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+        "gst": ("gst", "gstin", "gst_no", "gstnumber", "tax_id", "tin"),
+        "inv_date": ("invoice_date", "inv_date", "bill_date", "date", "created_date"),
+        "due_date": ("due", "due_date", "payment_due", "pay_date", "expiry"),
+        "currency": ("currency", "curr", "ccy", "cur_code"),
+        "location": ("location", "site", "branch", "office", "city", "state"),
+        "mop": ("payment", "pay_method", "mop", "method", "pay_mode"),
+        "account_head": ("account", "acc_head", "gl_code", "cost_center", "dept"),
+    }
+
+    def map_auxiliary_columns(self, df: pd.DataFrame) -> Dict[str, List]:
+        """Candidate columns (in frame order) for each auxiliary field, resolved once per frame."""
+        lowered = [(col, str(col).lower()) for col in df.columns]
+        return {
+            field: [col for col, lc in lowered if any(k in lc for k in keywords)]
+            for field, keywords in self.AUX_FIELD_KEYWORDS.items()
+        }
+
+    def _first_text(self, df: pd.DataFrame, columns: List,
+                    default: str = "", upper: bool = False) -> pd.Series:
+        """Per row, the first non-empty value among the candidate columns."""
+        result = pd.Series(default, index=df.index, dtype=object)
+        pending = pd.Series(True, index=df.index)
+        for col in columns:
+            col_data = df[col]
+            if isinstance(col_data, pd.DataFrame):  # duplicate header; first one wins
+                col_data = col_data.iloc[:, 0]
+            val = self._as_text(col_data)
+            if upper:
+                val = val.str.upper()
+            ok = pending & col_data.notna() & val.ne("") & ~val.str.lower().isin(("nan", "none"))
+            result[ok] = val[ok]
+            pending &= ~ok
+            if not pending.any():
+                break
+        return result
+
+    def _first_date(self, df: pd.DataFrame, columns: List) -> pd.Series:
+        """Per row, the first parseable date among the candidate columns ('' if none)."""
+        result = pd.Series("", index=df.index, dtype=object)
+        pending = pd.Series(True, index=df.index)
+        for col in columns:
+            col_data = df[col]
+            if isinstance(col_data, pd.DataFrame):
+                col_data = col_data.iloc[:, 0]
+            dates = self._parse_date_column(col_data[pending])
+            ok = dates.index[dates.notna()]
+            result[ok] = dates[ok]
+            pending[ok] = False
+            if not pending.any():
+                break
+        return result
+
+    def extract_gst_numbers(self, df: pd.DataFrame, gst_columns: List,
+                            column_mapping: Dict[str, str]) -> pd.Series:
+        """GST number per row from GST-ish headers, falling back to the vendor column."""
+        result = pd.Series("", index=df.index, dtype=object)
+        pending = pd.Series(True, index=df.index)
+        cols = list(gst_columns)
+        vendor_col = column_mapping.get("vendor")
+        if vendor_col in df.columns:
+            cols.append(vendor_col)
+        for col in cols:
+            col_data = df[col]
+            if isinstance(col_data, pd.DataFrame):
+                col_data = col_data.iloc[:, 0]
+            found = self._as_text(col_data).str.extract(_GST_GROUP_RE, expand=False)
+            ok = pending & found.notna()
+            result[ok] = found[ok].str.upper()
+            pending &= ~ok
+            if not pending.any():
+                break
+        return result
+
+    @staticmethod
+    def _parse_date_column(series: pd.Series) -> pd.Series:
+        """'YYYY-MM-DD' per value (NaN where unparseable); one to_datetime pass per format."""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series.dt.strftime("%Y-%m-%d")
+
+        result = pd.Series(np.nan, index=series.index, dtype=object)
+        present = series.notna()
+        # datetime-like objects in an object column format directly
+        is_dt = present & series.map(lambda v: hasattr(v, "strftime"))
+        if is_dt.any():
+            result[is_dt] = series[is_dt].map(_strftime_or_nan)
+            # values whose strftime failed fall through to the text formats, as before
+            is_dt &= result.notna()
+
+        text = series.astype(str).str.strip()
+        pending = present & ~is_dt & ~text.str.lower().isin(("", "nan", "none", "nat"))
+        for fmt in _DATE_FORMATS:
+            if not pending.any():
+                break
+            parsed = pd.to_datetime(text[pending], format=fmt, errors="coerce")
+            ok = parsed.index[parsed.notna()]
+            result[ok] = parsed[ok].dt.strftime("%Y-%m-%d")
+            pending[ok] = False
+        return result
+
+    # ------------------------- Column mapping / validation --------------------------
+
+    def map_dataframe_columns(self, df: pd.DataFrame) -> Dict[str, str]:
+        """
+        Map dataframe columns to standard fields with robust heuristics.
+        Targets: invoice_number, vendor, amount
+        """
+        cols: List[str] = [c for c in (str(c).strip() for c in df.columns) if c]
+        if not cols:
+            self.logger.warning("No columns found in DataFrame for mapping.")
+            return {}
+
+        matches = _column_name_matches(tuple(cols))
+        bad_words = _COLUMN_BAD_WORDS
+        # per-column stats shared by every target's scoring pass
+        ratios: Dict[str, float] = {}
+        is_object: Dict[str, bool] = {}
+        text_lengths: Dict[str, float] = {}
+
+        def mean_text_length(series: pd.Series) -> float:
+            # a sample is plenty for telling names apart from codes
+            try:
+                return float(series.head(LENGTH_SAMPLE_ROWS).astype("string").str.len().mean())
+            except Exception:
+                return 0.0
+
+        def numeric_ratio(series: pd.Series) -> float:
+            # share of parseable numbers in a leading sample; numeric dtypes only need a null check
+            sample = series.head(NUMERIC_SAMPLE_ROWS)
+            try:
+                if pd.api.types.is_numeric_dtype(sample.dtype):
+                    return float(sample.notna().mean())
+                conv = pd.to_numeric(sample, errors="coerce")
+                return float(conv.notna().mean())
+            except Exception:
+                return 0.0
+
+        def find_best(target: str) -> Optional[str]:
+            exact, found = matches[target]
+            if exact is not None:
+                return exact
+            if not found:
+                return None
+            candidates: List[str] = list(found)
+            for c in candidates:
+                if c not in is_object:
+                    is_object[c] = df[c].dtype == object
+                if target != "vendor" and c not in ratios:
+                    ratios[c] = numeric_ratio(df[c])
+                if target == "vendor" and c not in text_lengths:
+                    text_lengths[c] = mean_text_length(df[c])
+
+            if target == "invoice_number":
+                def inv_score(c: str) -> int:
+                    lc = c.lower(); score = 0
+                    if any(tok in lc for tok in ["no", "num", "id", "#"]): score += 3
+                    if any(tok in lc for tok in ["invoice", "voucher", "doc"]): score += 2
+                    if is_object[c]: score += 1
+                    if ratios[c] < 0.5: score += 1
+                    return score
+                candidates.sort(key=inv_score, reverse=True)
+                return candidates[0]
+
+            if target == "vendor":
+                def ven_score(c: str) -> int:
+                    lc = c.lower(); score = 0
+                    if any(tok in lc for tok in ["vendor", "supplier", "party", "company"]): score += 2
+                    if is_object[c]: score += 2
+                    if text_lengths[c] >= 6: score += 1
+                    return score
+                candidates.sort(key=ven_score, reverse=True)
+                return candidates[0]
+
+            if target == "amount":
+                def amt_score(c: str) -> int:
+                    lc = c.lower(); score = 0
+                    if "grand" in lc: score += 3
+                    if "total" in lc: score += 2
+                    if any(tok in lc for tok in ["amount", "amt", "value"]): score += 1
+                    if ratios[c] >= 0.6: score += 3
+                    if any(b in lc for b in bad_words["amount"]): score -= 3
+                    return score
+                candidates.sort(key=amt_score, reverse=True)
+                return candidates[0]
+
+            return candidates[0]
+
+        mapping: Dict[str, str] = {}
+        for key in ["invoice_number", "vendor", "amount"]:
+            got = find_best(key)
+            if got:
+                mapping[key] = got
+
+        # avoid collisions
+        if len(set(mapping.values())) < len(mapping):
+            inv = mapping.get("invoice_number")
+            ven = mapping.get("vendor")
+            amt = mapping.get("amount")
+            if amt in {inv, ven}:
+                self.logger.warning("Amount column collided with another target — dropping amount mapping.")
+                mapping.pop("amount", None)
+
+        self.logger.info(f"Production column mapping: {mapping}")
+        return mapping
+
+    def parse_amount(self, amount_value) -> Optional[float]:
+        """Parse one amount to float with guardrails (thin wrapper over parse_amount_column)."""
+        parsed = self.parse_amount_column(pd.Series([amount_value], dtype=object)).iloc[0]
+        return None if pd.isna(parsed) else float(parsed)
+
+    def parse_amount_column(self, amounts: pd.Series) -> pd.Series:
+        """Amounts for a whole column: strip non-numerics, one to_numeric pass, NaN where unparseable.
+
+        Out-of-range values are still returned; they are reported as a single count.
+        """
+        cleaned = self._as_text(amounts).str.replace(_AMOUNT_STRIP_RE, "", regex=True)
+        parsed = pd.to_numeric(cleaned.where(amounts.notna()), errors="coerce").astype(float)
+        out_of_range = int((parsed.notna() & ~parsed.between(0, 1_000_000)).sum())
+        if out_of_range:
+            self.logger.warning(f"{out_of_range} amount(s) outside reasonable range")
+        return parsed
+
+    def check_discrepancies(self, row: pd.Series, column_mapping: Dict[str, str]) -> Optional[str]:
+        """Detect basic issues for one row (thin wrapper over check_discrepancies_frame)."""
+        return self.check_discrepancies_frame(row.to_frame().T, column_mapping).iloc[0]
+
+    def check_discrepancies_frame(self, df: pd.DataFrame, column_mapping: Dict[str, str],
+                                  amounts: Optional[pd.Series] = None) -> pd.Series:
+        """Detect basic issues for later review; one '; '-joined note (or None) per row."""
+        try:
+            # One fixed-width message array per check ('' where the row is fine)
+            issues: List[np.ndarray] = []
+            if column_mapping.get("amount"):
+                if amounts is None:
+                    amounts = self.parse_amount_column(df[column_mapping["amount"]])
+                amt = amounts.to_numpy(dtype=np.float64, na_value=np.nan)
+                issues.append(np.where(np.isnan(amt), "Invalid or missing amount",
+                                       np.where(amt <= 0, "Zero or negative amount", "")))
+            if column_mapping.get("vendor"):
+                vendor = self._as_text(df[column_mapping["vendor"]]).str.lower()
+                issues.append(np.where(vendor.isin(("", "nan", "unknown")).to_numpy(),
+                                       "Missing vendor information", ""))
+            if not issues:
+                return pd.Series([None] * len(df), index=df.index, dtype=object)
+            joined = issues[0]
+            for more in issues[1:]:
+                sep = np.where((joined != "") & (more != ""), "; ", "")
+                joined = np.char.add(np.char.add(joined, sep), more)
+            return pd.Series(np.where(joined != "", joined.astype(object), None), index=df.index, dtype=object)
+        except Exception as e:
+            self.logger.error(f"Discrepancy check failed: {e}")
+            return pd.Series(f"Discrepancy check error: {e}", index=df.index, dtype=object)
+
+    def calculate_row_hashes(self, df: pd.DataFrame) -> List[str]:
+        """Per-row content hash for the whole frame in one vectorised pass (64-bit, session-keyed hex).
+
+        Non-cryptographic dedupe/tracking key: SipHash over the column buffers, keyed per session.
+        """
+        # hash_pandas_object takes a 16-character key; derive it from the session id
+        key = hashlib.blake2b(self.session_id.encode("utf-8"), digest_size=8, person=b"invval").hexdigest()
+        try:
+            hashes = pd.util.hash_pandas_object(df, index=False, hash_key=key).to_numpy()
+        except TypeError:
+            # Unhashable cells (lists/dicts from odd readers): hash their text instead
+            hashes = pd.util.hash_pandas_object(df.astype(str), index=False, hash_key=key).to_numpy()
+        # Hex-encode all hashes in one call (big-endian bytes), then slice 16 chars per row
+        hex_all = hashes.astype(">u8").tobytes().hex()
+        return [hex_all[i:i + 16] for i in range(0, len(hex_all), 16)]
+
+
+class ProductionInvoiceValidationSystem(LocalFileProcessor):
     """Production invoice validation system orchestrator"""
 
     def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self.session_id = f"prod_session_{int(time.time())}"
+        super().__init__(f"prod_session_{int(time.time())}", deep_stats=_env('DEEP_STATS') == '1')
 
         # Initialize production components
         self.db_manager = DatabaseManager()
         self.email_notifier = ProductionEmailNotifier()
 
+        # Environment switches, resolved once per session
+        self.rms_credentials = bool(_env('RMS_USERNAME') and _env('RMS_PASSWORD'))
+        self._force_demo = (_env('FORCE_DEMO') or 'false').lower() == 'true'
+        self._max_attach_bytes = int(_env('EMAIL_MAX_ATTACH_MB', '18')) * 1024 * 1024
+
         # Initialize Selenium if available and configured
-        if SELENIUM_AVAILABLE and (os.getenv('RMS_USERNAME') and os.getenv('RMS_PASSWORD')):
+        if SELENIUM_AVAILABLE and self.rms_credentials:
             self.selenium_manager = ProductionSeleniumManager()
             self.rms_enabled = True
         else:
@@ -797,8 +1781,20 @@ class ProductionInvoiceValidationSystem:
             'environment': 'GitHub Actions' if config.IS_GITHUB_ACTIONS else 'Local'
         }
 
+        # Directories already created this session (skip repeat mkdir syscalls)
+        self._dirs_ready: set = set()
+
         self.logger.info(f"Production Invoice Validation System initialized - Session: {self.session_id}")
 
+    def _ensure_dir(self, directory) -> bool:
+        """mkdir -p once per session; returns True on the first (creating) call"""
+        key = str(directory)
+        if key in self._dirs_ready:
+            return False
+        Path(directory).mkdir(exist_ok=True, parents=True)
+        self._dirs_ready.add(key)
+        return True
+
     def setup_directories(self):
         """Create required production directories"""
         directories = [
@@ -809,8 +1805,8 @@ class ProductionInvoiceValidationSystem:
         ]
 
         for directory in directories:
-            Path(directory).mkdir(exist_ok=True, parents=True)
-            self.logger.info(f"Production directory ready: {directory}")
+            if self._ensure_dir(directory):
+                self.logger.info(f"Production directory ready: {directory}")
 
     def validate_configuration(self) -> bool:
         """Validate production configuration with graceful degradation"""
@@ -829,10 +1825,7 @@ class ProductionInvoiceValidationSystem:
             validation_errors.append(f"Database validation failed: {e}")
 
         # Check RMS credentials (warning in production)
-        rms_username = os.getenv('RMS_USERNAME')
-        rms_password = os.getenv('RMS_PASSWORD')
-
-        if not rms_username or not rms_password:
+        if not self.rms_credentials:
             self.logger.warning("RMS credentials not configured - RMS features will be skipped")
         else:
             self.logger.info("RMS credentials configured - RMS integration enabled")
@@ -862,18 +1855,16 @@ class ProductionInvoiceValidationSystem:
     def create_demo_data_if_needed(self):
         """Create demo data only when explicitly enabled and no real files exist."""
         # Gate demo creation behind an env flag (default OFF)
-        if os.getenv('FORCE_DEMO', 'false').lower() != 'true':
+        if not self._force_demo:
             self.logger.info("FORCE_DEMO!=true → skipping demo data creation")
             return
 
         downloads_dir = Path(config.DOWNLOADS_DIR)
-        downloads_dir.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(downloads_dir)
 
         # Consider only data files the pipeline actually ingests
-        file_patterns = ['*.xlsx', '*.xls', '*.csv', '*.tsv']
-        existing_files = []
-        for pattern in file_patterns:
-            existing_files.extend(downloads_dir.glob(pattern))
+        by_ext = _files_by_suffix(downloads_dir)
+        existing_files = [f for ext in ('.xlsx', '.xls', '.csv', '.tsv') for f in by_ext[ext]]
 
         if existing_files:
             self.logger.info("Data files already present → demo not created")
@@ -925,7 +1916,7 @@ class ProductionInvoiceValidationSystem:
         demo_excel = downloads_dir / 'demo_invoices_production.xlsx'
 
         df.to_csv(demo_csv, index=False)
-        df.to_excel(demo_excel, index=False, engine='openpyxl')
+        df.to_excel(demo_excel, index=False, engine=XLSX_WRITE_ENGINE)
 
         self.logger.info(f"Created demo data files: {demo_csv}, {demo_excel}")
 
@@ -939,8 +1930,18 @@ class ProductionInvoiceValidationSystem:
     def check_pdf_valid(self, pdf_path: str) -> bool:
         """Check if PDF file is valid using PyMuPDF"""
         try:
-            doc = fitz.open(pdf_path)
-            doc.close()
+            # Cheap structural check first: header and EOF marker (both within 1 KiB per the spec)
+            with open(pdf_path, 'rb') as f:
+                head = f.read(1024)
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 1024))
+                tail = f.read()
+            if b'%PDF-' not in head or b'%%EOF' not in tail:
+                self.logger.warning(f"PDF validation failed for {pdf_path}: missing PDF header or EOF marker")
+                return False
+
+            with fitz.open(pdf_path):
+                pass
             return True
         except Exception as e:
             self.logger.warning(f"PDF validation failed for {pdf_path}: {e}")
@@ -956,12 +1957,9 @@ class ProductionInvoiceValidationSystem:
 
             downloads_dir = Path(config.DOWNLOADS_DIR)
 
-            # Find all supported files
-            file_patterns = ['*.xlsx', '*.xls', '*.csv', '*.tsv', '*.txt']
-            files_to_process = []
-
-            for pattern in file_patterns:
-                files_to_process.extend(downloads_dir.glob(pattern))
+            # Find all supported files (one directory listing)
+            by_ext = _files_by_suffix(downloads_dir)
+            files_to_process = [f for ext in ('.xlsx', '.xls', '.csv', '.tsv', '.txt') for f in by_ext[ext]]
 
             if not files_to_process:
                 self.logger.warning("No files found to process after demo data creation")
@@ -969,44 +1967,26 @@ class ProductionInvoiceValidationSystem:
 
             self.logger.info(f"Found {len(files_to_process)} files to process")
 
-            for file_path in files_to_process:
-                try:
-                    self.logger.info(f"Processing production file: {file_path}")
-
-                    # Process file with encoding detection
-                    if file_path.suffix.lower() in ['.csv', '.tsv', '.txt']:
-                        # Detect encoding
-                        with open(file_path, 'rb') as f:
-                            raw_data = f.read(10000)
-                            encoding_result = chardet.detect(raw_data)
-                            encoding = encoding_result['encoding'] or 'utf-8'
-                    
-                        delimiter = '\t' if file_path.suffix.lower() == '.tsv' else ','
-                        df = pd.read_csv(file_path, encoding=encoding, delimiter=delimiter)
-                    else:
-                        # Excel files
-                        try:
-                            # Try smart_read_table first
-                            df = fr.smart_read_table(file_path)
-                        except Exception as e:
-                            self.logger.warning(f"smart_read_table failed: {e}, trying pandas directly")
-                            try:
-                                # Fallback to pandas
-                                if file_path.suffix.lower() == '.xls':
-                                    df = pd.read_excel(file_path, engine='xlrd')
-                                else:
-                                    df = pd.read_excel(file_path, engine='openpyxl')
-                            except Exception as e2:
-                                self.logger.error(f"Failed to process {os.path.basename(file_path)}: {e2}")
-                                continue
-
-                    # Clean and validate data
-                    df = self.clean_dataframe(df)
-                    validation_results = self.validate_invoice_data(df)
+            # Read/clean/validate/build per file (in worker processes for larger batches);
+            # database writes and bookkeeping stay here, in order
+            for file_path, prepared in zip(files_to_process, self.prepare_local_files(files_to_process)):
+                try:
+                    if prepared.get('error'):
+                        raise RuntimeError(prepared['error'])
+                    validation_results = prepared.get('validation')
+                    if validation_results is None:
+                        # unreadable spreadsheet; already logged
+                        continue
 
+                    processed_count = 0
                     if validation_results['valid']:
                         # Process invoices
-                        processed_count = self.process_invoice_dataframe(df, str(file_path))
+                        try:
+                            if prepared['records']:
+                                # One transaction for the whole file instead of a commit per row
+                                processed_count = self.db_manager.insert_invoice_validations_bulk(prepared['records'])
+                        except Exception as e:
+                            self.logger.error(f"DataFrame processing failed: {e}")
 
                         if processed_count > 0:
                             processed_files.append(str(file_path))
@@ -1041,8 +2021,7 @@ class ProductionInvoiceValidationSystem:
                     if validation_results.get('warnings'):
                         self.processing_results['warnings'].extend(validation_results['warnings'])
 
-                    if 'processed_count' in locals():
-                        self.processing_results['total_processed'] += processed_count
+                    self.processing_results['total_processed'] += processed_count
 
                 except Exception as e:
                     self.processing_results['failed'] += 1
@@ -1060,155 +2039,76 @@ class ProductionInvoiceValidationSystem:
             self.processing_results['errors'].append(error_msg)
 
         return processed_files
-    
-    def clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Clean and standardize dataframe for production use."""
-        try:
-            original_shape = df.shape
-
-            # Remove completely empty rows and columns
-            df = df.dropna(how="all").dropna(axis=1, how="all")
-
-            # Standardize column names
-            df.columns = [
-                str(col).strip().lower().replace(" ", "_").replace("-", "_")
-                for col in df.columns
-            ]
-
-            # Remove duplicate columns
-            df = df.loc[:, ~df.columns.duplicated()]
-
-            # Clean string/object columns
-            for col in df.select_dtypes(include=["object"]).columns:
-                df[col] = (
-                    df[col]
-                    .astype(str)
-                    .str.strip()
-                    .replace({"nan": np.nan, "None": np.nan, "": np.nan})
-                )
-
-            cleaned_shape = df.shape
-            self.logger.info(f"DataFrame cleaned: {original_shape} -> {cleaned_shape}")
-            return df
-
-        except Exception as e:
-            self.logger.error(f"DataFrame cleaning failed: {e}")
-            return df
 
-    def validate_invoice_data(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Validate invoice data structure and content for production"""
-        validation_results = {'valid': True, 'errors': [], 'warnings': [], 'statistics': {}}
+    def prepare_local_files(self, paths: List[Path]) -> List[Dict]:
+        """prepare_local_file for each path, in worker processes when the batch is large enough"""
+        workers = min(os.cpu_count() or 1, len(paths))
+        if workers <= 1 or len(paths) < PARALLEL_FILES_MIN:
+            # Same standalone processor the workers build, so both paths see the same state
+            processor = LocalFileProcessor(self.session_id, self.rms_enabled, self._deep_stats, self.logger)
+            return [processor.prepare_local_file(p) for p in paths]
+
+        args = [(p, self.session_id, self.rms_enabled, self._deep_stats, self.logger.name) for p in paths]
+        # Not fork: the parent has the db-log-writer thread and open sqlite connections
+        ctx = _worker_mp_context()
+        # forkserver/spawn workers start with no handlers; ship their records to ours
+        log_queue = ctx.Queue()
+        root = logging.getLogger()
+        listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+        listener.start()
         try:
-            required_patterns = {
-                'invoice_number': ['invoice', 'inv_no', 'number', 'inv_num'],
-                'vendor': ['vendor', 'supplier', 'company'],
-                'amount': ['amount', 'total', 'value', 'sum', 'price']
-            }
-            found_columns = {}
-            for req_col, patterns in required_patterns.items():
-                matching_cols = [col for col in df.columns if any(p in col.lower() for p in patterns)]
-                if matching_cols:
-                    found_columns[req_col] = matching_cols[0]
-                else:
-                    validation_results['warnings'].append(f"Recommended column pattern not found: {req_col}")
-
-            if found_columns.get('invoice_number'):
-                empty_invoices = df[found_columns['invoice_number']].isna().sum()
-                duplicate_invoices = df[found_columns['invoice_number']].duplicated().sum()
-                if empty_invoices > 0:
-                    validation_results['warnings'].append(f"{empty_invoices} rows with empty invoice numbers")
-                if duplicate_invoices > 0:
-                    validation_results['warnings'].append(f"{duplicate_invoices} duplicate invoice numbers")
-
-            if found_columns.get('amount'):
-                amount_col = found_columns['amount']
-                try:
-                    numeric_amounts = pd.to_numeric(df[amount_col], errors='coerce')
-                    invalid_amounts = numeric_amounts.isna().sum()
-                    negative_amounts = (numeric_amounts < 0).sum()
-                    if invalid_amounts > 0:
-                        validation_results['warnings'].append(f"{invalid_amounts} rows with invalid amounts")
-                    if negative_amounts > 0:
-                        validation_results['warnings'].append(f"{negative_amounts} rows with negative amounts")
-                except Exception as e:
-                    validation_results['warnings'].append(f"Amount validation error: {e}")
-
-            mu = df.memory_usage(deep=True).sum()
-            validation_results['statistics'] = {
-                'total_rows': len(df),
-                'total_columns': len(df.columns),
-                'found_columns': found_columns,
-                'memory_usage': mu,
-                'file_size_estimate': f"{mu / 1024:.2f} KB"
-            }
-            self.logger.info(f"Production validation completed: {validation_results['statistics']}")
-        except Exception as e:
-            validation_results['valid'] = False
-            validation_results['errors'].append(f"Validation process failed: {e}")
-            self.logger.error(f"Invoice data validation failed: {e}")
-        return validation_results
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                     initializer=_init_file_worker,
+                                     initargs=(log_queue, root.getEffectiveLevel())) as executor:
+                return list(executor.map(_prepare_local_file_worker, args))
+        finally:
+            listener.stop()
 
     def collect_email_attachments(self, summary_file: Optional[str]) -> List[str]:
         """Choose a compact set of useful attachments for the email."""
-        attachments: List[str] = []
+        # Chosen path -> size; dict order is attachment order and dedupes repeats
+        chosen: Dict[str, int] = {}
+        # Sizes come from the directory scans; only the summary needs its own stat
+        scanned: Dict[str, int] = {}
         try:
             # Always include summary if present
-            if summary_file and os.path.exists(summary_file):
-                attachments.append(summary_file)
+            if summary_file:
+                try:
+                    chosen[summary_file] = os.stat(summary_file).st_size
+                except OSError:
+                    pass
 
             # Today's logs (at most 2)
             try:
                 today_tag = datetime.now().strftime('%Y%m%d')
-                log_dir = Path(config.LOGS_DIR)
-                if log_dir.exists():
-                    todays_logs = sorted(log_dir.glob(f"*{today_tag}*.log"))
-                    for f in todays_logs[:2]:
-                        attachments.append(str(f))
+                todays_logs = [f for f in _files_by_suffix(config.LOGS_DIR, scanned)[".log"] if today_tag in f.name]
+                for f in todays_logs[:2]:
+                    chosen.setdefault(str(f), scanned[str(f)])
             except Exception:
                 # logs are optional
                 pass
 
             # Useful data outputs from downloads/
-            dl = Path(config.DOWNLOADS_DIR)
-            if dl.exists():
-                # A few CSV/XLSX (max 4)
-                for pat in ("*.csv", "*.xlsx"):
-                    for f in sorted(dl.glob(pat))[:4]:
-                        attachments.append(str(f))
-                # A few invoice documents (max 3)
-                for pat in ("*.pdf", "*.jpg", "*.jpeg", "*.png"):
-                    for f in sorted(dl.glob(pat))[:3]:
-                        attachments.append(str(f))
-
-            # Deduplicate while preserving order
-            seen: set = set()
-            deduped: List[str] = []
-            for x in attachments:
-                if x not in seen:
-                    deduped.append(x)
-                    seen.add(x)
-            attachments = deduped
+            by_ext = _files_by_suffix(config.DOWNLOADS_DIR, scanned)
+            # A few CSV/XLSX (max 4)
+            for ext in (".csv", ".xlsx"):
+                for f in by_ext[ext][:4]:
+                    chosen.setdefault(str(f), scanned[str(f)])
+            # A few invoice documents (max 3)
+            for ext in (".pdf", ".jpg", ".jpeg", ".png"):
+                for f in by_ext[ext][:3]:
+                    chosen.setdefault(str(f), scanned[str(f)])
+
+            attachments = list(chosen)
+            max_bytes = self._max_attach_bytes
 
             # Size guard -> zip if too large
-            def _total_bytes(paths: List[str]) -> int:
-                total = 0
-                for p in paths:
-                    try:
-                        if os.path.exists(p):
-                            total += os.path.getsize(p)
-                    except Exception:
-                        pass
-                return total
-
-            max_mb = int(os.getenv("EMAIL_MAX_ATTACH_MB", "18"))
-            max_bytes = max_mb * 1024 * 1024
-
-            if _total_bytes(attachments) > max_bytes:
+            if sum(chosen.values()) > max_bytes:
                 zip_path = Path(config.DOWNLOADS_DIR) / f"email_attachments_{self.session_id}.zip"
                 with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
                     for f in attachments:
                         if os.path.exists(f):
-                            zf.write(f, arcname=os.path.basename(f))
+                            _zip_add(zf, f, os.path.basename(f))
                 attachments = [str(zip_path)]
 
             return attachments
@@ -1220,374 +2120,18 @@ class ProductionInvoiceValidationSystem:
             return []
 
     def process_invoice_dataframe(self, df: pd.DataFrame, source_file: str) -> int:
-        """Enhanced invoice processing with additional field extraction."""
+        """Enhanced invoice processing with additional field extraction (column-wise)."""
         processed_count = 0
         try:
-            column_mapping = self.map_dataframe_columns(df)
-
-            for index, row in df.iterrows():
-                try:
-                    # Extract fields via resilient helpers
-                    gst_no = self.extract_gst_number(row, column_mapping)
-                    inv_date = self.extract_invoice_date(row, column_mapping)
-                    due_date = self.extract_due_date(row, column_mapping)
-                    currency = self.extract_currency(row, column_mapping)
-                    location = self.extract_location(row, column_mapping)
-                    mop = self.extract_payment_method(row, column_mapping)
-                    account_head = self.extract_account_head(row, column_mapping)
-
-                    invoice_number_col = column_mapping.get("invoice_number", "")
-                    vendor_col = column_mapping.get("vendor", "")
-                    amount_col = column_mapping.get("amount", "")
-
-                    invoice_number = str(row.get(invoice_number_col, f"AUTO_{index}")).strip()
-                    vendor_name = str(row.get(vendor_col, "Unknown Vendor")).strip()
-                    amount = self.parse_amount(row.get(amount_col, None))
-
-                    if not invoice_number or invoice_number.lower() == "nan":
-                        continue
-
-                    invoice_data = {
-                        "invoice_number": invoice_number,
-                        "vendor_name": vendor_name,
-                        "amount": amount,
-                        "status": "processed",
-                        "rms_status": "pending" if getattr(self, "rms_enabled", False) else "n/a",
-                        "file_path": source_file,
-                        "hash_value": self.calculate_row_hash(row),
-                        "processed_by": f"production_{self.session_id}",
-                        "discrepancies": self.check_discrepancies(row, column_mapping),
-                        "notes": f"Processed in production mode at {datetime.now().isoformat()}",
-                        # extended fields
-                        "gst_no": gst_no,
-                        "inv_date": inv_date,
-                        "due_date": due_date,
-                        "currency": currency,
-                        "location": location,
-                        "mop": mop,
-                        "account_head": account_head,
-                    }
-
-                    record_id = self.db_manager.insert_invoice_validation_enhanced(invoice_data)
-                    if record_id:
-                        processed_count += 1
-                        if processed_count <= 5:
-                            self.logger.debug(f"Processed invoice: {invoice_number}")
-
-                except Exception as e:
-                    self.logger.error(f"Failed to process row {index}: {e}")
-                    continue
-
+            records = self.build_invoice_records(df, source_file)
+            if records:
+                # One transaction for the whole file instead of a commit per row
+                processed_count = self.db_manager.insert_invoice_validations_bulk(records)
         except Exception as e:
             self.logger.error(f"DataFrame processing failed: {e}")
 
         return processed_count
 
-    # ----------------------- Extraction helpers (row + mapping) -----------------------
-
-    def extract_gst_number(self, row: pd.Series, column_mapping: Dict[str, str]) -> str:
-        """Extract GST number from likely fields or text columns."""
-        try:
-            patt = re.compile(r"\b\d{2}[A-Z]{5}\d{4}[A-Z][A-Z0-9]Z[A-Z0-9]\b", re.I)
-            # try GST-ish headers first
-            for col in row.index:
-                lc = str(col).lower()
-                if any(k in lc for k in ("gst", "gstin", "gst_no", "gstnumber", "tax_id", "tin")):
-                    val = str(row.get(col, "")).strip()
-                    m = patt.search(val)
-                    if m:
-                        return m.group(0).upper()
-            # fallback: scan vendor/notes columns
-            vendor = str(row.get(column_mapping.get("vendor", ""), "")).strip()
-            m = patt.search(vendor)
-            if m:
-                return m.group(0).upper()
-        except Exception as e:
-            self.logger.debug(f"GST extraction failed: {e}")
-        return ""
-
-    def _parse_any_date_str(self, value) -> Optional[str]:
-        """Try common date formats; return 'YYYY-MM-DD' or None."""
-        if value is None or (isinstance(value, float) and np.isnan(value)):
-            return None
-        # already a datetime-like?
-        try:
-            if hasattr(value, "strftime"):
-                return value.strftime("%Y-%m-%d")
-        except Exception:
-            pass
-        s = str(value).strip()
-        if not s or s.lower() in ("nan", "none", "nat"):
-            return None
-        fmts = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%Y/%m/%d"]
-        for f in fmts:
-            try:
-                return datetime.strptime(s, f).strftime("%Y-%m-%d")
-            except Exception:
-                continue
-        return None
-
-    def extract_invoice_date(self, row: pd.Series, column_mapping: Dict[str, str]) -> str:
-        try:
-            for col in row.index:
-                lc = str(col).lower()
-                if any(k in lc for k in ("invoice_date", "inv_date", "bill_date", "date", "created_date")):
-                    d = self._parse_any_date_str(row.get(col))
-                    if d:
-                        return d
-        except Exception as e:
-            self.logger.debug(f"Invoice date extraction failed: {e}")
-        return ""
-
-    def extract_due_date(self, row: pd.Series, column_mapping: Dict[str, str]) -> str:
-        try:
-            for col in row.index:
-                lc = str(col).lower()
-                if any(k in lc for k in ("due", "due_date", "payment_due", "pay_date", "expiry")):
-                    d = self._parse_any_date_str(row.get(col))
-                    if d:
-                        return d
-        except Exception as e:
-            self.logger.debug(f"Due date extraction failed: {e}")
-        return ""
-
-    def extract_currency(self, row: pd.Series, column_mapping: Dict[str, str]) -> str:
-        try:
-            for col in row.index:
-                lc = str(col).lower()
-                if any(k in lc for k in ("currency", "curr", "ccy", "cur_code")):
-                    val = str(row.get(col, "")).strip().upper()
-                    if val and val.lower() not in ("nan", "none"):
-                        return val
-        except Exception as e:
-            self.logger.debug(f"Currency extraction failed: {e}")
-        return "USD"
-
-    def extract_location(self, row: pd.Series, column_mapping: Dict[str, str]) -> str:
-        try:
-            for col in row.index:
-                lc = str(col).lower()
-                if any(k in lc for k in ("location", "site", "branch", "office", "city", "state")):
-                    val = str(row.get(col, "")).strip()
-                    if val and val.lower() not in ("nan", "none"):
-                        return val
-        except Exception as e:
-            self.logger.debug(f"Location extraction failed: {e}")
-        return ""
-
-    def extract_payment_method(self, row: pd.Series, column_mapping: Dict[str, str]) -> str:
-        try:
-            for col in row.index:
-                lc = str(col).lower()
-                if any(k in lc for k in ("payment", "pay_method", "mop", "method", "pay_mode")):
-                    val = str(row.get(col, "")).strip()
-                    if val and val.lower() not in ("nan", "none"):
-                        return val
-        except Exception as e:
-            self.logger.debug(f"Payment method extraction failed: {e}")
-        return ""
-
-    def extract_account_head(self, row: pd.Series, column_mapping: Dict[str, str]) -> str:
-        try:
-            for col in row.index:
-                lc = str(col).lower()
-                if any(k in lc for k in ("account", "acc_head", "gl_code", "cost_center", "dept")):
-                    val = str(row.get(col, "")).strip()
-                    if val and val.lower() not in ("nan", "none"):
-                        return val
-        except Exception as e:
-            self.logger.debug(f"Account head extraction failed: {e}")
-        return ""
-
-    # ------------------------- Column mapping / validation --------------------------
-
-    def map_dataframe_columns(self, df: pd.DataFrame) -> Dict[str, str]:
-        """
-        Map dataframe columns to standard fields with robust heuristics.
-        Targets: invoice_number, vendor, amount
-        """
-        cols: List[str] = [str(c).strip() for c in df.columns if str(c).strip()]
-        if not cols:
-            self.logger.warning("No columns found in DataFrame for mapping.")
-            return {}
-
-        cols_lower = {c.lower(): c for c in cols}
-
-        def norm_key(s: str) -> str:
-            return re.sub(r"[^a-z0-9]+", "", s.lower())
-
-        norm_map = {norm_key(c): c for c in cols}
-
-        rules = {
-            "invoice_number": {
-                "exact": [
-                    "invoice_number", "invoice number", "invoice_no", "invoice no",
-                    "inv_no", "inv no", "inv_num", "inv#", "invoiceid", "voucherno",
-                    "voucher_no", "doc_no", "document_no", "purchaseinvno",
-                ],
-                "syn": ["invoice", "inv", "voucher", "doc", "bill"],
-            },
-            "vendor": {
-                "exact": [
-                    "vendor", "vendor_name", "vendor name", "supplier", "supplier_name",
-                    "supplier name", "partyname", "party", "payee", "company", "beneficiary",
-                ],
-                "syn": ["vendor", "supplier", "party", "company", "payee", "beneficiary"],
-            },
-            "amount": {
-                "exact": [
-                    "amount", "invoice_amount", "invoice amount", "total", "total_amount",
-                    "grand_total", "net_amount", "gross_amount", "paytyamt", "taxablevalue",
-                ],
-                "syn": ["amount", "total", "grand", "value", "sum", "amt"],
-            },
-        }
-
-        bad_words = {
-            "invoice_number": {"date", "time", "entry", "created", "updated", "month", "year"},
-            "vendor": {"address", "gst", "pan", "state", "city", "country", "code", "id"},
-            "amount": {
-                "igst", "cgst", "sgst", "vat", "tax", "tds", "discount", "round", "roundoff",
-                "cess", "rate", "qty", "quantity", "price_per", "unit",
-            },
-        }
-
-        def numeric_ratio(series: pd.Series) -> float:
-            try:
-                conv = pd.to_numeric(series, errors="coerce")
-                return float(conv.notna().mean())
-            except Exception:
-                return 0.0
-
-        def find_best(target: str) -> Optional[str]:
-            rule = rules[target]
-            # exact lower
-            for name in rule["exact"]:
-                key = name.lower()
-                if key in cols_lower:
-                    return cols_lower[key]
-            # exact normalized
-            for name in rule["exact"]:
-                keyn = norm_key(name)
-                if keyn in norm_map:
-                    return norm_map[keyn]
-            # synonyms
-            candidates: List[str] = []
-            for syn in rule["syn"]:
-                s = syn.lower()
-                for c in cols:
-                    lc = c.lower()
-                    if s in lc and not any(b in lc for b in bad_words[target]):
-                        candidates.append(c)
-            if not candidates:
-                return None
-
-            if target == "invoice_number":
-                def inv_score(c: str) -> int:
-                    lc = c.lower(); score = 0
-                    if any(tok in lc for tok in ["no", "num", "id", "#"]): score += 3
-                    if any(tok in lc for tok in ["invoice", "voucher", "doc"]): score += 2
-                    if df[c].dtype == object: score += 1
-                    try:
-                        if numeric_ratio(df[c]) < 0.5: score += 1
-                    except Exception:
-                        pass
-                    return score
-                candidates.sort(key=inv_score, reverse=True)
-                return candidates[0]
-
-            if target == "vendor":
-                def ven_score(c: str) -> int:
-                    lc = c.lower(); score = 0
-                    if any(tok in lc for tok in ["vendor", "supplier", "party", "company"]): score += 2
-                    if df[c].dtype == object: score += 2
-                    try:
-                        if pd.Series(df[c].astype(str)).str.len().mean() >= 6: score += 1
-                    except Exception:
-                        pass
-                    return score
-                candidates.sort(key=ven_score, reverse=True)
-                return candidates[0]
-
-            if target == "amount":
-                def amt_score(c: str) -> int:
-                    lc = c.lower(); score = 0
-                    if "grand" in lc: score += 3
-                    if "total" in lc: score += 2
-                    if any(tok in lc for tok in ["amount", "amt", "value"]): score += 1
-                    try:
-                        if numeric_ratio(df[c]) >= 0.6: score += 3
-                    except Exception:
-                        pass
-                    if any(b in lc for b in bad_words["amount"]): score -= 3
-                    return score
-                candidates.sort(key=amt_score, reverse=True)
-                return candidates[0]
-
-            return candidates[0]
-
-        mapping: Dict[str, str] = {}
-        for key in ["invoice_number", "vendor", "amount"]:
-            got = find_best(key)
-            if got:
-                mapping[key] = got
-
-        # avoid collisions
-        if len(set(mapping.values())) < len(mapping):
-            inv = mapping.get("invoice_number")
-            ven = mapping.get("vendor")
-            amt = mapping.get("amount")
-            if amt in {inv, ven}:
-                self.logger.warning("Amount column collided with another target — dropping amount mapping.")
-                mapping.pop("amount", None)
-
-        self.logger.info(f"Production column mapping: {mapping}")
-        return mapping
-
-    def parse_amount(self, amount_value) -> Optional[float]:
-        """Parse amount to float with guardrails."""
-        if pd.isna(amount_value):
-            return None
-        try:
-            amount_str = re.sub(r"[^\d.-]", "", str(amount_value).strip())
-            if amount_str:
-                parsed = float(amount_str)
-                # keep bounds warning, but still return parsed
-                if not (0 <= parsed <= 1_000_000):
-                    self.logger.warning(f"Amount outside reasonable range: {parsed}")
-                return parsed
-        except Exception as e:
-            self.logger.warning(f"Failed to parse amount '{amount_value}': {e}")
-        return None
-
-    def check_discrepancies(self, row: pd.Series, column_mapping: Dict[str, str]) -> Optional[str]:
-        """Detect basic issues for later review."""
-        discrepancies: List[str] = []
-        try:
-            if column_mapping.get("amount"):
-                amount = self.parse_amount(row.get(column_mapping["amount"]))
-                if amount is None:
-                    discrepancies.append("Invalid or missing amount")
-                elif amount <= 0:
-                    discrepancies.append("Zero or negative amount")
-            if column_mapping.get("vendor"):
-                vendor = str(row.get(column_mapping["vendor"], "")).strip()
-                if not vendor or vendor.lower() in ("", "nan", "unknown"):
-                    discrepancies.append("Missing vendor information")
-            return "; ".join(discrepancies) if discrepancies else None
-        except Exception as e:
-            self.logger.error(f"Discrepancy check failed: {e}")
-            return f"Discrepancy check error: {e}"
-
-    def calculate_row_hash(self, row: pd.Series) -> str:
-        """Stable-ish row hash for dedupe/tracking."""
-        try:
-            row_tuple = tuple(map(str, row.values))
-            row_str = f"{self.session_id}_{hash(row_tuple)}"
-            return hashlib.md5(row_str.encode("utf-8")).hexdigest()
-        except Exception:
-            return hashlib.md5(f"{self.session_id}_{time.time()}".encode("utf-8")).hexdigest()
-
     # ------------------------------- RMS downloading -------------------------------
 
     def download_rms_exports(self, start_date: Optional[str], end_date: Optional[str]) -> List[str]:
@@ -1603,8 +2147,15 @@ class ProductionInvoiceValidationSystem:
             self.logger.info("RMS disabled → skipping RMS downloads")
             return files
 
+        # Selenium is only needed on this path
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.common.keys import Keys
+        from selenium.webdriver.common.action_chains import ActionChains
+
         download_dir = Path(getattr(config, "DOWNLOADS_DIR", "downloads"))
-        download_dir.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(download_dir)
 
         def _enable_downloads(drv):
             payload = {"behavior": "allow", "downloadPath": str(download_dir)}
@@ -1617,27 +2168,124 @@ class ProductionInvoiceValidationSystem:
                     self.logger.warning(f"CDP downloads not enabled: {e}")
 
         def _snapshot() -> set:
-            return {p.name for p in download_dir.glob("*")}
+            return {p.name for paths in _files_by_suffix(download_dir).values() for p in paths}
         
-        def _new_completed_files(before: set) -> List[Path]:
+        def _new_completed_files(before: set, by_ext: Dict[str, List[Path]]) -> List[Path]:
             wanted = (".csv", ".xlsx", ".xls", ".pdf", ".jpg", ".jpeg")
-            out: List[Path] = []
-            for p in download_dir.glob("*"):
-                if p.name in before:
-                    continue
-                if p.suffix.lower() in wanted and not p.name.endswith((".crdownload", ".tmp")):
-                    out.append(p)
-            return out
+            return [p for ext in wanted for p in by_ext.get(ext, ()) if p.name not in before]
 
         def _wait_for_downloads(before: set, timeout: int = 180) -> List[Path]:
+            # Re-scan only when the directory changes (watchdog), else poll once a second
             end = time.time() + timeout
-            while time.time() < end:
-                partials = list(download_dir.glob("*.crdownload")) + list(download_dir.glob("*.tmp"))
-                news = _new_completed_files(before)
-                if not partials and news:
-                    return news
-                time.sleep(1)
-            return _new_completed_files(before)
+            changed = threading.Event()
+            observer = None
+            if WATCHDOG_AVAILABLE:
+                try:
+                    from watchdog.observers import Observer
+                    from watchdog.events import FileSystemEventHandler
+
+                    class _Wake(FileSystemEventHandler):
+                        def on_any_event(self, event):
+                            changed.set()
+
+                    observer = Observer()
+                    observer.schedule(_Wake(), str(download_dir), recursive=False)
+                    observer.start()
+                except Exception as e:
+                    self.logger.debug(f"watchdog unavailable for {download_dir}, polling instead: {e}")
+                    observer = None
+            try:
+                while True:
+                    changed.clear()
+                    by_ext = _files_by_suffix(download_dir)
+                    partials = by_ext.get(".crdownload") or by_ext.get(".tmp")
+                    news = _new_completed_files(before, by_ext)
+                    remaining = end - time.time()
+                    if (not partials and news) or remaining <= 0:
+                        return news
+                    # Events wake us early; the tick is only a safety net for missed events
+                    changed.wait(min(remaining, DOWNLOAD_WATCH_TICK if observer else 1.0))
+            finally:
+                if observer is not None:
+                    observer.stop()
+                    observer.join()
+
+        def _fetch_documents(drv, links) -> Tuple[List[Path], List[Any]]:
+            """GET document links on a thread pool using the driver's session cookies.
+
+            Returns (saved files, link elements that could not be fetched this way).
+            """
+            import requests
+
+            session = requests.Session()
+            try:
+                session.headers["User-Agent"] = drv.execute_script("return navigator.userAgent")
+            except Exception:
+                pass
+            for c in drv.get_cookies():
+                session.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+
+            claimed: set = set()
+            claim_lock = threading.Lock()
+
+            def _claim(name: str) -> Path:
+                # Unique target per fetch: never overwrite a sibling download or an older file
+                stem, ext = os.path.splitext(name)
+                with claim_lock:
+                    candidate, n = name, 1
+                    while candidate in claimed or (download_dir / candidate).exists():
+                        n += 1
+                        candidate = f"{stem}_{n}{ext}"
+                    claimed.add(candidate)
+                return download_dir / candidate
+
+            def _get(url: str) -> Path:
+                with session.get(url, stream=True, timeout=60) as r:
+                    r.raise_for_status()
+                    content_type = r.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                    if content_type != "application/pdf" and not content_type.startswith("image/"):
+                        raise ValueError(f"unexpected content type {content_type or 'none'!r}")
+                    name = _document_file_name(url, r.headers.get("Content-Disposition"), content_type)
+                    signature = _DOC_SIGNATURES.get(os.path.splitext(name)[1].lower())
+                    if signature is None:
+                        raise ValueError(f"not a PDF/JPG document: {name}")
+                    r.raw.decode_content = True
+                    head = r.raw.read(1024)
+                    # e.g. an expired session answering with an HTML login page
+                    if not head.startswith(signature):
+                        raise ValueError(f"{name} does not start with the expected file signature")
+                    target = _claim(name)
+                    tmp = target.with_name(target.name + ".tmp")
+                    try:
+                        with open(tmp, "wb") as f:
+                            f.write(head)
+                            shutil.copyfileobj(r.raw, f, ZIP_COPY_BUFFER)
+                        os.replace(tmp, target)
+                    except Exception:
+                        tmp.unlink(missing_ok=True)
+                        raise
+                return target
+
+            by_url: Dict[str, Any] = {}
+            leftover: List[Any] = []
+            for a in links:
+                href = a.get_attribute("href") or ""
+                if href.lower().startswith(("http://", "https://")):
+                    by_url.setdefault(href, a)
+                else:
+                    leftover.append(a)
+
+            fetched: List[Path] = []
+            with session, ThreadPoolExecutor(max_workers=DOC_DOWNLOAD_WORKERS) as pool:
+                futures = {pool.submit(_get, url): url for url in by_url}
+                for fut in as_completed(futures):
+                    url = futures[fut]
+                    try:
+                        fetched.append(fut.result())
+                    except Exception as e:
+                        self.logger.debug(f"HTTP fetch failed for {url}: {e}")
+                        leftover.append(by_url[url])
+            return fetched, leftover
 
         def click_with_retry(drv, element, max_attempts=3):
             """Click element with multiple strategies and retry logic"""
@@ -1907,21 +2555,28 @@ class ProductionInvoiceValidationSystem:
                     )[:50]  # Limit to 50 to avoid timeout
                 
                     if links:
-                        before = _snapshot()
-                        for i, a in enumerate(links):
-                            try:
-                                if i % 10 == 0:
-                                    self.logger.info(f"Processing link {i+1}/{len(links)}...")
-                                drv.execute_script("arguments[0].scrollIntoView({block:'center'})", a)
-                                ActionChains(drv).key_down(Keys.CONTROL).click(a).key_up(Keys.CONTROL).perform()
-                                time.sleep(0.2)
-                            except Exception:
-                                continue
-                            
-                        downloaded = _wait_for_downloads(before, timeout=180)
-                        for p in downloaded:
-                            if p.suffix.lower() in (".pdf", ".jpg", ".jpeg"):
-                                files.append(str(p))
+                        # Plain GETs with the browser's cookies, in parallel; only links that
+                        # fail that way (e.g. script postbacks) are Ctrl+clicked in the browser
+                        fetched, leftover = _fetch_documents(drv, links)
+                        files.extend(str(p) for p in fetched if p.suffix.lower() in (".pdf", ".jpg", ".jpeg"))
+                        self.logger.info(f"Fetched {len(fetched)}/{len(links)} document link(s) over HTTP")
+
+                        if leftover:
+                            before = _snapshot()
+                            for i, a in enumerate(leftover):
+                                try:
+                                    if i % 10 == 0:
+                                        self.logger.info(f"Processing link {i+1}/{len(leftover)}...")
+                                    drv.execute_script("arguments[0].scrollIntoView({block:'center'})", a)
+                                    ActionChains(drv).key_down(Keys.CONTROL).click(a).key_up(Keys.CONTROL).perform()
+                                    time.sleep(0.2)
+                                except Exception:
+                                    continue
+
+                            downloaded = _wait_for_downloads(before, timeout=180)
+                            for p in downloaded:
+                                if p.suffix.lower() in (".pdf", ".jpg", ".jpeg"):
+                                    files.append(str(p))
 
             except Exception as e:
                 self.logger.warning(f"Invoice document download step failed: {e}")
@@ -1935,7 +2590,7 @@ class ProductionInvoiceValidationSystem:
                 if doc_files:
                     with zipfile.ZipFile(bundle, "w", compression=zipfile.ZIP_DEFLATED) as zf:
                         for p in doc_files:
-                            zf.write(p, arcname=p.name)
+                            _zip_add(zf, p, p.name)
                         
                     if bundle.exists():
                         files.append(str(bundle))
@@ -1955,14 +2610,31 @@ class ProductionInvoiceValidationSystem:
     def build_invoices_zip(self) -> Optional[str]:
         """Zip any PDFs/JPGs found in downloads/ for emailing."""
         download_dir = Path(getattr(config, "DOWNLOADS_DIR", "downloads"))
-        docs = list(download_dir.glob("*.pdf")) + list(download_dir.glob("*.jpg")) + list(download_dir.glob("*.jpeg"))
+        sizes: Dict[str, int] = {}
+        by_ext = _files_by_suffix(download_dir, sizes)
+        docs = by_ext[".pdf"] + by_ext[".jpg"] + by_ext[".jpeg"]
         if not docs:
             return None
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         zpath = download_dir / f"invoices_{ts}.zip"
-        with zipfile.ZipFile(zpath, "w", zipfile.ZIP_DEFLATED) as z:
-            for p in docs:
-                z.write(p, arcname=p.name)
+
+        def read_small(p: Path) -> Optional[bytes]:
+            return p.read_bytes() if sizes[str(p)] <= ZIP_PREFETCH_MAX_BYTES else None
+
+        # Reader threads stay a bounded window ahead of the single writer
+        with ThreadPoolExecutor(max_workers=ZIP_READ_WORKERS) as pool, \
+                zipfile.ZipFile(zpath, "w", zipfile.ZIP_DEFLATED) as z:
+            ahead = deque(pool.submit(read_small, p) for p in docs[:ZIP_READ_AHEAD])
+            for i, p in enumerate(docs):
+                data = ahead.popleft().result()
+                if i + ZIP_READ_AHEAD < len(docs):
+                    ahead.append(pool.submit(read_small, docs[i + ZIP_READ_AHEAD]))
+                if data is None:
+                    _zip_add(z, p, p.name)
+                else:
+                    zinfo = zipfile.ZipInfo.from_file(p, arcname=p.name)
+                    zinfo.compress_type = zipfile.ZIP_STORED
+                    z.writestr(zinfo, data)
         self.logger.info(f"Built invoices archive: {zpath}")
         return str(zpath)
 
@@ -1972,30 +2644,33 @@ class ProductionInvoiceValidationSystem:
         """Write validation results to CSV files (validation_report.csv + discrepancy_report.csv)."""
         try:
             out_dir = out_dir or Path(getattr(config, "DOWNLOADS_DIR", "downloads"))
-            out_dir.mkdir(parents=True, exist_ok=True)
-
-            if df_all is None:
-                with self.db_manager.get_connection() as conn:
-                    df_all = pd.read_sql_query(
-                        "SELECT * FROM invoice_validations WHERE processed_by LIKE ? ORDER BY created_at DESC",
-                        conn,
-                        params=(f"%{self.session_id}%",),
-                    )
-
-            if df_all is None or df_all.empty:
-                self.logger.warning("No data available for CSV export")
-                return
+            self._ensure_dir(out_dir)
 
             valid_csv = out_dir / "validation_report.csv"
             disc_csv = out_dir / "discrepancy_report.csv"
 
-            df_all.to_csv(valid_csv, index=False)
-
-            if "discrepancies" in df_all.columns:
-                df_disc = df_all[df_all["discrepancies"].notna()]
-                df_disc.to_csv(disc_csv, index=False)
+            if df_all is None:
+                # Stream rows from the cursor into both files; no DataFrame for the bulk path
+                rows = self.db_manager.iter_query(
+                    "SELECT * FROM invoice_validations WHERE processed_by LIKE ? ORDER BY created_at DESC",
+                    (f"%{self.session_id}%",),
+                )
+                with closing(rows):
+                    if not self._stream_validation_csvs(rows, valid_csv, disc_csv):
+                        self.logger.warning("No data available for CSV export")
+                        return
             else:
-                pd.DataFrame().to_csv(disc_csv, index=False)
+                if df_all.empty:
+                    self.logger.warning("No data available for CSV export")
+                    return
+
+                df_all.to_csv(valid_csv, index=False)
+
+                if "discrepancies" in df_all.columns:
+                    df_disc = df_all[df_all["discrepancies"].notna()]
+                    df_disc.to_csv(disc_csv, index=False)
+                else:
+                    pd.DataFrame().to_csv(disc_csv, index=False)
 
             # track attachments if the dict exists
             try:
@@ -2008,19 +2683,46 @@ class ProductionInvoiceValidationSystem:
         except Exception as e:
             self.logger.warning(f"write_validation_csvs skipped: {e}")
 
+    @staticmethod
+    def _stream_validation_csvs(rows: Iterable[sqlite3.Row], valid_csv: Path, disc_csv: Path) -> bool:
+        """Write all rows, and those with discrepancies, in CSV_STREAM_BATCH slices.
+
+        Returns False (writing nothing) when there are no rows.
+        """
+        first = next(iter(rows), None)
+        if first is None:
+            return False
+        columns = first.keys()
+        disc_idx = columns.index("discrepancies") if "discrepancies" in columns else None
+        rows = chain((first,), rows)
+
+        with open(valid_csv, "w", newline="", encoding="utf-8") as vf, \
+                open(disc_csv, "w", newline="", encoding="utf-8") as df_:
+            valid_out = csv.writer(vf, lineterminator="\n")
+            disc_out = csv.writer(df_, lineterminator="\n")
+            valid_out.writerow(columns)
+            if disc_idx is None:
+                df_.write("\n")
+            else:
+                disc_out.writerow(columns)
+            while True:
+                batch = list(islice(rows, CSV_STREAM_BATCH))
+                if not batch:
+                    break
+                valid_out.writerows(batch)
+                if disc_idx is not None:
+                    disc_out.writerows(r for r in batch if r[disc_idx] is not None)
+        return True
+
     def generate_summary_report(self) -> Optional[str]:
         """Generate an Excel summary from whatever columns exist in the DB."""
         try:
             out_dir = Path(getattr(config, "DOWNLOADS_DIR", "downloads"))
-            out_dir.mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(out_dir)
             ts = datetime.now().strftime("%Y%m%d_%H%M%S")
             report_path = out_dir / f"production_summary_{ts}.xlsx"
 
-            with self.db_manager.get_connection() as conn:
-                df = pd.read_sql_query(
-                    "SELECT * FROM invoice_validations ORDER BY created_at DESC",
-                    conn,
-                )
+            df = self.db_manager.read_df("SELECT * FROM invoice_validations ORDER BY created_at DESC")
 
             if df is None or df.empty:
                 self.logger.info("No validation records found for report generation")
@@ -2029,17 +2731,11 @@ class ProductionInvoiceValidationSystem:
             with pd.ExcelWriter(report_path, engine="openpyxl") as writer:
                 df.to_excel(writer, sheet_name="Invoice Validations", index=False)
 
-                # Autosize columns
-                ws = writer.sheets["Invoice Validations"]
-                for col in ws.columns:
-                    max_len = 0
-                    col_letter = col[0].column_letter
-                    for cell in col:
-                        try:
-                            max_len = max(max_len, len(str(cell.value)) if cell.value is not None else 0)
-                        except Exception:
-                            pass
-                    ws.column_dimensions[col_letter].width = min(max_len + 2, 50)
+                # Autosize columns from pandas string lengths rather than walking every cell
+                if len(df) <= AUTOSIZE_MAX_ROWS:
+                    ws = writer.sheets["Invoice Validations"]
+                    for i, width in enumerate(column_widths(df, 50), 1):
+                        ws.column_dimensions[get_column_letter(i)].width = width
 
             self.logger.info(f"Excel report generated: {report_path}")
             return str(report_path)
@@ -2103,15 +2799,21 @@ class ProductionInvoiceValidationSystem:
             except Exception as e:
                 self.logger.error(f"Local file processing failed: {e}")
 
-            # 6) Reports
+            # 6) Reports: CSVs, Excel summary and invoice ZIP are independent I/O-bound
+            # writes, so run them side by side and collect results in the usual order
             attachments: List[str] = []
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                csv_future = pool.submit(self.write_validation_csvs)
+                summary_future = pool.submit(self.generate_summary_report)
+                zip_future = pool.submit(self.build_invoices_zip)
+
             try:
-                self.write_validation_csvs()
+                csv_future.result()
             except Exception as e:
                 self.logger.warning(f"write_validation_csvs skipped: {e}")
 
             try:
-                summary_path = self.generate_summary_report()
+                summary_path = summary_future.result()
                 if summary_path:
                     attachments.append(str(summary_path))
             except Exception as e:
@@ -2119,7 +2821,7 @@ class ProductionInvoiceValidationSystem:
 
             # Include invoices ZIP if any docs exist
             try:
-                z = self.build_invoices_zip()
+                z = zip_future.result()
                 if z:
                     attachments.append(z)
             except Exception as e:
@@ -2136,7 +2838,8 @@ class ProductionInvoiceValidationSystem:
             # 7) Email results (best-effort)
             try:
                 if getattr(self, "email_notifier", None):
-                    self.processing_results['attachment_files'] = attachments
+                    # Order-preserving dedup; the same file must not be attached twice
+                    self.processing_results['attachment_files'] = list(dict.fromkeys(attachments))
                     self.processing_results['overall_status'] = 'success' if processed_count > 0 else 'failed'
                     self.email_notifier.send_processing_summary(self.session_id, self.processing_results)
             except Exception as e:
@@ -2152,6 +2855,27 @@ class ProductionInvoiceValidationSystem:
                 print(f"Fatal error in run_validation_process: {e}")
             return False
             
+def _init_file_worker(log_queue, level: int) -> None:
+    """ProcessPoolExecutor initializer: route every worker log record to the parent's queue"""
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+
+
+def _prepare_local_file_worker(args) -> Dict[str, Any]:
+    """ProcessPoolExecutor entry point for LocalFileProcessor.prepare_local_file"""
+    file_path, session_id, rms_enabled, deep_stats, logger_name = args
+    # Same logger name as the parent; __name__ is __mp_main__ in a spawned worker
+    logger = logging.getLogger(logger_name)
+    return LocalFileProcessor(session_id, rms_enabled, deep_stats, logger).prepare_local_file(file_path)
+
+
+def _worker_mp_context():
+    """forkserver where available (POSIX), else spawn; never fork a threaded parent"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
 def main():
     """Production main entry point"""
     try:
@@ -2170,6 +2894,7 @@ def main():
         validation_system = ProductionInvoiceValidationSystem()
 
         success = validation_system.run_validation_process()
+        validation_system.db_manager.close()
 
         if success:
             logger.info("=== Production Invoice Validation System Completed Successfully ===")
@@ -1,19 +1,35 @@
 # reporter.py
 
 import os
+import re
+import numpy as np
 import pandas as pd
 from openpyxl import load_workbook, Workbook
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
 from openpyxl.worksheet.filters import AutoFilter
 from openpyxl.chart import BarChart, PieChart, Reference
+from openpyxl.cell import WriteOnlyCell
 from datetime import datetime
 import logging
+from utils.excel import column_widths
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sheet colours for snapshot reports
+STATUS_COLORS = {
+    "VALID": "C6EFCE",      # Light Green
+    "INVALID": "FFC7CE",    # Light Red
+    "FLAGGED": "FFEB9C",    # Light Orange
+    "UNKNOWN": "E1D5E7",    # Light Purple
+    "SUMMARY": "D9E1F2"     # Light Blue
+}
+
+# delta_report_YYYY-MM-DD.xlsx -> (year, month, day)
+_DELTA_REPORT_RE = re.compile(r"delta_report_(\d{4})-(\d{2})-(\d{2})\.xlsx$")
+
 def save_snapshot_report(data, start_date, end_date, output_dir="snapshots"):
     """
     Enhanced version of snapshot report with better error handling,
@@ -59,9 +75,6 @@ def save_snapshot_report(data, start_date, end_date, output_dir="snapshots"):
             else:
                 df['Status'] = 'UNKNOWN'
 
-        # Ensure status values are standardized
-        df['Status'] = df['Status'].fillna('UNKNOWN').str.upper()
-        
         # Map common status variations
         status_mapping = {
             'VALID': 'VALID',
@@ -72,38 +85,34 @@ def save_snapshot_report(data, start_date, end_date, output_dir="snapshots"):
             'UNKNOWN': 'UNKNOWN',
             'ERROR': 'INVALID'
         }
-        df['Status'] = df['Status'].map(status_mapping).fillna('UNKNOWN')
+        # Standardize once per distinct raw value, then remap the category codes;
+        # grouping/counting afterwards works on small ints instead of strings
+        raw = df['Status'].astype('category')
+        labels = [status_mapping.get(str(c).upper(), 'UNKNOWN') for c in raw.cat.categories]
+        categories = list(dict.fromkeys(labels + ['UNKNOWN']))
+        # Trailing slot catches code -1 (missing status)
+        lookup = np.array([categories.index(label) for label in labels] + [categories.index('UNKNOWN')])
+        df['Status'] = pd.Categorical.from_codes(lookup[raw.cat.codes.to_numpy()], categories)
 
-        # Split by status
-        valid_df = df[df["Status"] == "VALID"]
-        invalid_df = df[df["Status"] == "INVALID"] 
-        flagged_df = df[df["Status"] == "FLAGGED"]
-        unknown_df = df[df["Status"] == "UNKNOWN"]
+        # Split by status in a single pass
+        status_parts = {status: part for status, part in df.groupby("Status", sort=False, observed=True)}
 
         # Create summary statistics
         summary_data = create_summary_statistics(df, start_date, end_date)
 
-        # Write to Excel with pandas
-        with pd.ExcelWriter(filepath, engine="openpyxl") as writer:
-            # Summary sheet first
-            summary_df = pd.DataFrame(list(summary_data.items()), columns=['Metric', 'Value'])
-            summary_df.to_excel(writer, sheet_name="SUMMARY", index=False)
-            
-            # Data sheets
-            if not valid_df.empty:
-                valid_df.to_excel(writer, sheet_name="VALID", index=False)
-            if not invalid_df.empty:
-                invalid_df.to_excel(writer, sheet_name="INVALID", index=False)
-            if not flagged_df.empty:
-                flagged_df.to_excel(writer, sheet_name="FLAGGED", index=False)
-            if not unknown_df.empty:
-                unknown_df.to_excel(writer, sheet_name="UNKNOWN", index=False)
-            
-            # All data sheet
-            df.to_excel(writer, sheet_name="ALL_DATA", index=False)
+        # Stream straight into a write-only workbook: styles go on the header row and
+        # summary only, so there is no load_workbook/per-cell restyle round-trip
+        wb = Workbook(write_only=True)
+        summary_df = pd.DataFrame(list(summary_data.items()), columns=['Metric', 'Value'])
+        write_summary_sheet(wb, summary_df, STATUS_COLORS["SUMMARY"])
 
-        # Apply advanced formatting
-        format_excel_report(filepath, summary_data)
+        for status in ("VALID", "INVALID", "FLAGGED", "UNKNOWN"):
+            part = status_parts.get(status)
+            if part is not None and not part.empty:
+                write_data_sheet(wb, status, part, STATUS_COLORS[status])
+
+        write_data_sheet(wb, "ALL_DATA", df)
+        wb.save(filepath)
 
         logger.info(f"✅ Snapshot report saved: {filepath}")
         return filepath
@@ -180,19 +189,79 @@ def create_summary_statistics(df, start_date, end_date):
         logger.error(f"❌ Error creating summary statistics: {str(e)}")
         return {'Error': 'Failed to generate statistics'}
 
+def _sheet_rows(df):
+    """Plain row tuples for ws.append, with NaN/NaT as empty cells"""
+    return df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+def _styled_cell(ws, value, font=None, fill=None, alignment=None, border=None):
+    cell = WriteOnlyCell(ws, value=value)
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    if alignment is not None:
+        cell.alignment = alignment
+    if border is not None:
+        cell.border = border
+    return cell
+
+def write_summary_sheet(wb, summary_df, bg_color):
+    """Write the SUMMARY sheet to a write-only workbook with section styling"""
+    ws = wb.create_sheet("SUMMARY")
+    # Column widths must be set before the first row is streamed
+    for i, width in enumerate(column_widths(summary_df, 50), 1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+
+    summary_fill = PatternFill(start_color=bg_color, end_color=bg_color, fill_type="solid")
+    section_font = Font(bold=True, size=14, color="FFFFFF")
+    section_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    centered = Alignment(horizontal="center")
+    bold = Font(bold=True)
+
+    for row in [tuple(summary_df.columns), *_sheet_rows(summary_df)]:
+        cells = []
+        for col_num, value in enumerate(row, 1):
+            if value and str(value).startswith('==='):
+                # Section headers
+                cells.append(_styled_cell(ws, value, section_font, section_fill, centered))
+            elif col_num == 1:  # Metric names
+                cells.append(_styled_cell(ws, value, bold, summary_fill))
+            else:  # Values
+                cells.append(_styled_cell(ws, value, fill=summary_fill))
+        ws.append(cells)
+
+def write_data_sheet(wb, sheet_name, df, tab_color=None):
+    """Write a data sheet to a write-only workbook: styled header, frozen, filtered"""
+    ws = wb.create_sheet(sheet_name)
+    if tab_color:
+        ws.sheet_properties.tabColor = tab_color
+    for i, width in enumerate(column_widths(df, 30), 1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+    ws.freeze_panes = "A2"
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    border = Border(
+        left=Side(style='thin'), right=Side(style='thin'),
+        top=Side(style='thin'), bottom=Side(style='thin')
+    )
+    ws.append([
+        _styled_cell(ws, str(name), header_font, header_fill, header_alignment, border)
+        for name in df.columns
+    ])
+    for row in _sheet_rows(df):
+        ws.append(row)
+
+    ws.auto_filter.ref = f"A1:{get_column_letter(len(df.columns))}{len(df) + 1}"
+
 def format_excel_report(filepath, summary_data):
     """Apply advanced formatting to the Excel report"""
     try:
         wb = load_workbook(filepath)
         
         # Color scheme
-        color_map = {
-            "VALID": "C6EFCE",      # Light Green
-            "INVALID": "FFC7CE",    # Light Red
-            "FLAGGED": "FFEB9C",    # Light Orange
-            "UNKNOWN": "E1D5E7",    # Light Purple
-            "SUMMARY": "D9E1F2"     # Light Blue
-        }
+        color_map = STATUS_COLORS
         
         # Header styling
         header_font = Font(bold=True, color="FFFFFF")
@@ -308,12 +377,19 @@ def create_monthly_trend_report(data_folder="data", output_file="monthly_trend_r
     try:
         logger.info("📈 Creating monthly trend report...")
         
-        # Find all delta reports
+        # Find all delta reports, taking the date from the filename as we go
         report_files = []
         for root, dirs, files in os.walk(data_folder):
             for file in files:
-                if file.startswith("delta_report_") and file.endswith(".xlsx"):
-                    report_files.append(os.path.join(root, file))
+                m = _DELTA_REPORT_RE.match(file)
+                if not m:
+                    continue
+                try:
+                    report_date = datetime(*map(int, m.groups()))
+                except ValueError:
+                    logger.warning(f"⚠️ Skipping {file}: invalid date in filename")
+                    continue
+                report_files.append((os.path.join(root, file), report_date))
         
         if not report_files:
             logger.warning("⚠️ No delta reports found for trend analysis")
@@ -321,15 +397,10 @@ def create_monthly_trend_report(data_folder="data", output_file="monthly_trend_r
         
         # Process each report
         monthly_data = []
-        for report_file in sorted(report_files):
+        for report_file, report_date in sorted(report_files):
             try:
                 df = pd.read_excel(report_file)
                 
-                # Extract date from filename
-                filename = os.path.basename(report_file)
-                date_str = filename.replace("delta_report_", "").replace(".xlsx", "")
-                report_date = datetime.strptime(date_str, "%Y-%m-%d")
-                
                 # Calculate metrics
                 total_records = len(df)
                 if total_records > 0:
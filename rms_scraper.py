@@ -352,7 +352,9 @@ def wait_for_downloads(download_dir_abs, max_wait_time=300):
     
     for second in range(max_wait_time):
         try:
-            files = os.listdir(download_dir_abs)
+            # Only regular files; DirEntry carries the type without an extra stat
+            with os.scandir(download_dir_abs) as it:
+                files = [e.name for e in it if e.is_file()]
             
             # Look for ZIP file
             if not zip_file:
@@ -393,9 +395,7 @@ def wait_for_downloads(download_dir_abs, max_wait_time=300):
             dst_zip = os.path.join(download_dir_abs, "invoices.zip")
             
             if src_zip != dst_zip:  # Only rename if different
-                if os.path.exists(dst_zip):
-                    os.remove(dst_zip)
-                os.rename(src_zip, dst_zip)
+                os.replace(src_zip, dst_zip)  # atomic overwrite, same directory
             
             final_zip = dst_zip
             logger.info("✅ Saved ZIP as invoices.zip")
@@ -407,9 +407,7 @@ def wait_for_downloads(download_dir_abs, max_wait_time=300):
             dst_xls = os.path.join(download_dir_abs, "invoice_download.xls")
             
             if src_xls != dst_xls:  # Only rename if different
-                if os.path.exists(dst_xls):
-                    os.remove(dst_xls)
-                os.rename(src_xls, dst_xls)
+                os.replace(src_xls, dst_xls)  # atomic overwrite, same directory
             
             final_xls = dst_xls
             logger.info("✅ Saved XLS as invoice_download.xls")
@@ -483,8 +481,12 @@ def rms_download(start_date, end_date, headless=True):
         # Verify downloads
         final_invoice_path = os.path.join(download_dir_abs, "invoice_download.xls")
         
-        if os.path.exists(final_invoice_path):
-            file_size = os.path.getsize(final_invoice_path)
+        try:
+            file_size = os.stat(final_invoice_path).st_size
+        except OSError:
+            file_size = None
+
+        if file_size is not None:
             logger.info(f"✅ RMS download completed successfully!")
             logger.info(f"📊 Invoice data: {len(inv_data)} records")
             logger.info(f"📄 Invoice file: {final_invoice_path} ({file_size} bytes)")
@@ -521,8 +523,8 @@ if __name__ == "__main__":
     args = parser.parse_args()
     
     try:
-        start_date = datetime.strptime(args.start, '%Y-%m-%d')
-        end_date = datetime.strptime(args.end, '%Y-%m-%d')
+        start_date = datetime.fromisoformat(args.start)
+        end_date = datetime.fromisoformat(args.end)
         
         result = rms_download(start_date, end_date, headless=not args.show_browser)
         
@@ -8,15 +8,22 @@ import fitz  # PyMuPDF for PDF extraction
 from pathlib import Path
 import logging
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
 import hashlib
 from snapshot_handler import compare_with_snapshot, save_snapshot
-from email_sender import send_email_report
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Same optional email import as validator.py, so runs don't fail without email_sender
+try:
+    from email_sender import send_email_report
+except Exception as e:
+    logger.warning(f"email_sender not available ({e}); email step will be skipped.")
+    def send_email_report(*args, **kwargs):
+        logger.info("Skipping email report - email_sender not present.")
+
 def get_latest_data_folder(base="data"):
     """Find the most recent data folder"""
     try:
@@ -154,6 +161,18 @@ def extract_text_from_file(file_path):
         logger.error(f"Failed to extract text from {file_path}: {str(e)}")
         return ""
 
+# Below this many PDFs, worker start-up costs more than it saves
+PARALLEL_EXTRACT_MIN_FILES = 8
+
+def extract_texts(pdf_paths, workers=min(os.cpu_count() or 1, 4)):
+    """Extract text for many PDFs, in worker processes when the batch is large enough"""
+    if workers <= 1 or len(pdf_paths) < PARALLEL_EXTRACT_MIN_FILES:
+        return {path: extract_text_from_file(path) for path in pdf_paths}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(pdf_paths) // (workers * 4))
+        return dict(zip(pdf_paths, executor.map(extract_text_from_file, pdf_paths, chunksize=chunksize)))
+
 def match_fields(text, df, return_row=False):
     """Enhanced field matching with multiple criteria"""
     try:
@@ -274,11 +293,12 @@ def extract_zip_file(zip_path, extract_dir):
 def process_pdf_file(args):
     """Process a single PDF file - designed for parallel processing"""
     file_path, df = args
-    
+    logger.debug(f"Processing: {os.path.basename(file_path)}")
+    return build_result_record(file_path, extract_text_from_file(file_path), df)
+
+def build_result_record(file_path, text, df):
+    """Match already-extracted PDF text against the invoice sheet and build its result row"""
     try:
-        logger.debug(f"Processing: {os.path.basename(file_path)}")
-        
-        text = extract_text_from_file(file_path)
         if not text:
             return None
         
@@ -389,58 +409,6 @@ def request_pdf_regeneration(zip_path: str, run_dir: str) -> bool:
         return False
 
 def validate_invoices():
-    if not os.path.exists(XLS_PATH):
-        print(f"[ERROR] Invoice sheet not found at {XLS_PATH}")
-        return None
-
-    df = read_invoice_excel(XLS_PATH)
-    if df is None:
-        return None
-
-    print(f"[INFO] Invoice sheet loaded: {len(df)} rows.")
-
-    # === Load mapping file (if exists) ===
-    if os.path.exists(INV_CREATOR_MAP_PATH):
-        df_map = pd.read_csv(INV_CREATOR_MAP_PATH)
-        if "InvID" not in df_map.columns:
-            possible_col = [col for col in df_map.columns if "id" in col.lower()]
-            if possible_col:
-                df_map = df_map.rename(columns={possible_col[0]: "InvID"})
-            else:
-                print("[WARN] 'InvID' column not found in map. Assigning Unknown.")
-                df["Inv Created By"] = "Unknown"
-                df_map = pd.DataFrame(columns=["InvID", "Inv Created By"])
-        df = df.merge(df_map, on="InvID", how="left")
-        print(f"[INFO] Uploader mapping loaded from: {INV_CREATOR_MAP_PATH}")
-    else:
-        print("[WARN] inv_created_by_map.csv not found. Assigning all as Unknown.")
-        df["Inv Created By"] = "Unknown"
-
-def is_valid_zip(zip_path):
-    """Checks if the file is a valid zip file."""
-    try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            # Attempt to list the files in the ZIP to check if it's a valid zip file
-            zip_ref.testzip()
-        return True
-    except zipfile.BadZipFile:
-        return False
-
-    # === Step 1: Define paths ===
-    ZIP_PATH = os.path.join(base_dir, "invoices.zip")
-
-    # === Unzip invoices ===
-    if os.path.exists(ZIP_PATH):
-        if is_valid_zip(ZIP_PATH):  # Check if the ZIP file is valid
-            with zipfile.ZipFile(ZIP_PATH, 'r') as zip_ref:
-                zip_ref.extractall(UNZIP_DIR)
-            print(f"[INFO] Invoices unzipped to: {UNZIP_DIR}")
-        else:
-            print(f"[ERROR] The file at {ZIP_PATH} is not a valid ZIP file.")
-            return None  # Exit function if the ZIP file is invalid
-    else:
-        print(f"[ERROR] Invoices ZIP file not found: {ZIP_PATH}")
-
     """Main validation function with enhanced error handling and performance"""
     try:
         start_time = time.time()
@@ -509,46 +477,32 @@ def is_valid_zip(zip_path):
             return None
         
         # === Step 4: Process PDF files (with parallel processing) ===
-        print("📥 Step 4: Starting download process...")
-        try:
-        
-        # Prepare arguments for parallel processing
-        process_args = [(pdf_file, df) for pdf_file in pdf_files]
-        
-        # Use ThreadPoolExecutor for parallel processing
-        max_workers = min(4, len(pdf_files))  # Limit to 4 threads or number of files
+        # Use worker processes for text extraction
+        max_workers = min(4, os.cpu_count() or 1, len(pdf_files))  # Limit to 4 workers or number of files
         logger.info(f"Processing with {max_workers} parallel workers")
         
+        results = []
         processed_count = 0
         matched_count = 0
-
-        print("🔄 Initiating RMS download with retry logic...")
-            run_path = enhanced_rms_download_with_retry(
-                datetime.strptime(cumulative_start, "%Y-%m-%d"),
-                datetime.strptime(cumulative_end, "%Y-%m-%d")
-            )
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_file = {executor.submit(process_pdf_file, args): args[0] for args in process_args}
+        
+        # Text extraction is the CPU-heavy part: run it across worker processes,
+        # then match each text against the sheet in this process
+        texts = extract_texts(pdf_files, workers=max_workers)
+        for file_path in pdf_files:
+            processed_count += 1
             
-            # Process completed tasks
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
-                processed_count += 1
+            try:
+                result = build_result_record(file_path, texts.get(file_path, ""), df)
+                if result:
+                    results.append(result)
+                    matched_count += 1
                 
-                try:
-                    result = future.result()
-                    if result:
-                        results.append(result)
-                        matched_count += 1
+                # Log progress every 50 files
+                if processed_count % 50 == 0:
+                    logger.info(f"Progress: {processed_count}/{len(pdf_files)} files processed, {matched_count} matched")
                     
-                    # Log progress every 50 files
-                    if processed_count % 50 == 0:
-                        logger.info(f"Progress: {processed_count}/{len(pdf_files)} files processed, {matched_count} matched")
-                        
-                except Exception as e:
-                    logger.error(f"Error processing {os.path.basename(file_path)}: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error processing {os.path.basename(file_path)}: {str(e)}")
         
         logger.info(f"📊 Processing complete: {matched_count}/{len(pdf_files)} PDFs matched")
         
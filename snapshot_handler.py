@@ -1,17 +1,30 @@
 # snapshot_handler.py
 
 import os
+import re
+import shutil
 import pandas as pd
 import hashlib
 import json
 from datetime import datetime, timedelta
 import logging
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Parquet copies of snapshots are optional (needs pyarrow); xlsx stays the canonical format
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_OK = True
+except Exception:
+    PARQUET_OK = False
+
+# ISO dates (YYYY-MM-DD) sort lexicographically, so filename dates can be compared as strings
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}$")
+
 def compare_with_snapshot(df, snapshot_dir, today, primary_key='InvID'):
     """
     Enhanced comparison with current dataframe against previous snapshot
@@ -63,7 +76,7 @@ def compare_with_snapshot(df, snapshot_dir, today, primary_key='InvID'):
         # Load previous snapshot
         try:
             logger.info(f"📂 Loading previous snapshot: {previous_snapshot_path}")
-            previous_df = pd.read_excel(previous_snapshot_path)
+            previous_df = load_snapshot(previous_snapshot_path)
         except Exception as e:
             logger.error(f"❌ Could not load previous snapshot: {str(e)}")
             return {
@@ -143,29 +156,43 @@ def compare_with_snapshot(df, snapshot_dir, today, primary_key='InvID'):
             "stats": {"added": len(df) if df is not None else 0, "modified": 0, "deleted": 0, "unchanged": 0}
         }
 
+def load_snapshot(snapshot_path):
+    """Read a snapshot, preferring its Parquet copy when one was written"""
+    parquet_path = os.path.splitext(snapshot_path)[0] + ".parquet"
+    if PARQUET_OK and os.path.exists(parquet_path):
+        try:
+            return pd.read_parquet(parquet_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read {parquet_path}, using xlsx: {str(e)}")
+    return pd.read_excel(snapshot_path)
+
+def _iter_files(directory):
+    """Yield DirEntry objects for regular files in directory (stat info comes from scandir)"""
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_file():
+                yield entry
+
 def find_latest_snapshot(snapshot_dir, exclude_date=None):
     """Find the most recent snapshot file, optionally excluding a specific date"""
     try:
         snapshot_files = []
         
-        for file in os.listdir(snapshot_dir):
+        for entry in _iter_files(snapshot_dir):
+            file = entry.name
             if file.startswith("snapshot_") and file.endswith(".xlsx"):
-                try:
-                    # Extract date from filename
-                    date_part = file.replace("snapshot_", "").replace(".xlsx", "")
-                    
-                    # Skip if this is the date we want to exclude
-                    if exclude_date and date_part == exclude_date:
-                        continue
-                    
-                    # Validate date format
-                    datetime.strptime(date_part, "%Y-%m-%d")
-                    
-                    file_path = os.path.join(snapshot_dir, file)
-                    snapshot_files.append((date_part, file_path))
-                    
-                except ValueError:
-                    continue  # Skip invalid date formats
+                # Extract date from filename
+                date_part = file.replace("snapshot_", "").replace(".xlsx", "")
+                
+                # Skip if this is the date we want to exclude
+                if exclude_date and date_part == exclude_date:
+                    continue
+                
+                # Validate date format (skip invalid ones)
+                if not _DATE_RE.match(date_part):
+                    continue
+                
+                snapshot_files.append((date_part, entry.path))
         
         if not snapshot_files:
             return None
@@ -371,43 +398,61 @@ def save_snapshot(df, snapshot_dir, today, include_metadata=True):
             pd.DataFrame().to_excel(snapshot_path, index=False)
             return snapshot_path
         
-        # Save the main snapshot
-        df.to_excel(snapshot_path, index=False, engine='openpyxl')
+        # Clean up old snapshots (keep last 30 days) while the new ones are written;
+        # the cleanup never touches today's files
+        cleanup_pool = ThreadPoolExecutor(max_workers=1)
+        cleanup_future = cleanup_pool.submit(cleanup_old_snapshots, snapshot_dir)
+        cleanup_pool.shutdown(wait=False)
+        
+        try:
+            # Save the main snapshot
+            df.to_excel(snapshot_path, index=False, engine='openpyxl')
         
-        # Save as latest (overwrite if exists)
-        df.to_excel(latest_path, index=False, engine='openpyxl')
+            # Save as latest (overwrite if exists) - same content, so copy the bytes instead of re-serializing
+            shutil.copyfile(snapshot_path, latest_path)
         
-        # Save metadata if requested
-        if include_metadata:
-            try:
-                # Get potential primary keys with proper type conversion
-                potential_keys = get_potential_primary_keys(df)
+            # Parquet copy of latest for fast reloads in compare_with_snapshot
+            if PARQUET_OK:
+                latest_parquet = os.path.splitext(latest_path)[0] + ".parquet"
+                try:
+                    df.to_parquet(latest_parquet, index=False, compression="zstd")
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to save parquet snapshot (non-critical): {str(e)}")
+                    # Never leave an older parquet shadowing the new xlsx
+                    if os.path.exists(latest_parquet):
+                        os.remove(latest_parquet)
+        
+            # Save metadata if requested
+            if include_metadata:
+                try:
+                    # Get potential primary keys with proper type conversion
+                    potential_keys = get_potential_primary_keys(df)
                 
-                metadata = {
-                    'timestamp': datetime.now().isoformat(),
-                    'record_count': int(len(df)),  # Ensure it's a regular Python int
-                    'columns': list(df.columns),
-                    'date_range': today_str,
-                    'file_size': int(os.path.getsize(snapshot_path)),  # Ensure it's a regular Python int
-                    'primary_keys_detected': make_json_serializable(potential_keys)  # Make JSON safe
-                }
+                    metadata = {
+                        'timestamp': datetime.now().isoformat(),
+                        'record_count': int(len(df)),  # Ensure it's a regular Python int
+                        'columns': list(df.columns),
+                        'date_range': today_str,
+                        'file_size': int(os.path.getsize(snapshot_path)),  # Ensure it's a regular Python int
+                        'primary_keys_detected': make_json_serializable(potential_keys)  # Make JSON safe
+                    }
                 
-                metadata_path = os.path.join(snapshot_dir, f"metadata_{today_str}.json")
-                with open(metadata_path, 'w') as f:
-                    json.dump(metadata, f, indent=2, default=str)  # Use default=str as fallback
+                    metadata_path = os.path.join(snapshot_dir, f"metadata_{today_str}.json")
+                    with open(metadata_path, 'w') as f:
+                        json.dump(metadata, f, indent=2, default=str)  # Use default=str as fallback
                     
-                logger.debug(f"📄 Metadata saved: {metadata_path}")
+                    logger.debug(f"📄 Metadata saved: {metadata_path}")
                 
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to save metadata (non-critical): {str(e)}")
-        
-        logger.info(f"✅ Snapshot saved: {snapshot_path} ({len(df)} records)")
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to save metadata (non-critical): {str(e)}")
         
-        # Clean up old snapshots (keep last 30 days)
-        try:
-            cleanup_old_snapshots(snapshot_dir)
-        except Exception as e:
-            logger.warning(f"⚠️ Cleanup failed (non-critical): {str(e)}")
+            logger.info(f"✅ Snapshot saved: {snapshot_path} ({len(df)} records)")
+        finally:
+            # Always collect the cleanup, even when a write above raised
+            try:
+                cleanup_future.result()
+            except Exception as e:
+                logger.warning(f"⚠️ Cleanup failed (non-critical): {str(e)}")
         
         return snapshot_path
         
@@ -436,26 +481,33 @@ def get_potential_primary_keys(df):
     return potential_keys
 
 def cleanup_old_snapshots(snapshot_dir, keep_days=30):
-    """Remove snapshots older than specified days"""
+    """Remove snapshots older than specified days (the xlsx and its parquet copy)"""
     try:
-        cutoff_date = datetime.now() - timedelta(days=keep_days)
+        cutoff_str = (datetime.now() - timedelta(days=keep_days)).strftime("%Y-%m-%d")
+        removed = []
         
-        for filename in os.listdir(snapshot_dir):
-            if filename.startswith("snapshot_") and filename.endswith(".xlsx"):
+        for entry in _iter_files(snapshot_dir):
+            filename = entry.name
+            # save_snapshot writes a .parquet next to each .xlsx; both share the dated stem
+            if filename.startswith("snapshot_") and filename.endswith((".xlsx", ".parquet")):
                 try:
                     # Extract date from filename
-                    date_part = filename.replace("snapshot_", "").split("_")[0]  # Get date part before timestamp
-                    file_date = datetime.strptime(date_part, "%Y-%m-%d")
+                    stem = os.path.splitext(filename)[0]
+                    date_part = stem.replace("snapshot_", "").split("_")[0]  # Get date part before timestamp
+                    if not _DATE_RE.match(date_part):
+                        continue  # Skip files with invalid date format
                     
-                    if file_date < cutoff_date:
-                        file_path = os.path.join(snapshot_dir, filename)
-                        os.remove(file_path)
-                        logger.info(f"🗑️ Removed old snapshot: {filename}")
+                    # Same-day snapshots count as older than the cutoff time of day
+                    if date_part <= cutoff_str:
+                        os.remove(entry.path)
+                        removed.append(filename)
+                        logger.debug(f"🗑️ Removed old snapshot: {filename}")
                         
-                except ValueError:
-                    continue  # Skip files with invalid date format
                 except Exception as e:
                     logger.warning(f"⚠️ Could not remove {filename}: {str(e)}")
+        
+        if removed:
+            logger.info(f"🗑️ Removed {len(removed)} old snapshots (first 10: {removed[:10]})")
                     
     except Exception as e:
         logger.error(f"❌ Error during snapshot cleanup: {str(e)}")
@@ -24,6 +24,23 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# -----------------------------------------------------------------------------
+# Shared aggregates: one value_counts per dimension, reused by every panel
+# -----------------------------------------------------------------------------
+def count_dimensions(df: pd.DataFrame) -> dict:
+    counts = {}
+    if "Validation_Status" in df.columns:
+        counts["status"] = df["Validation_Status"].astype("string").value_counts()
+    if "Invoice_Currency" in df.columns:
+        counts["currency"] = df["Invoice_Currency"].value_counts()
+    if "Location" in df.columns:
+        counts["location"] = df["Location"].astype("string").str.split(",").str[0].value_counts()
+    if "Invoice_Creator_Name" in df.columns:
+        counts["creator"] = df["Invoice_Creator_Name"].astype("string").value_counts()
+    if "Due_Date_Notification" in df.columns:
+        counts["due"] = df["Due_Date_Notification"].value_counts()
+    return counts
+
 # -----------------------------------------------------------------------------
 # Universal table loader (handles .xlsx, .csv, and HTML disguised as .xls)
 # -----------------------------------------------------------------------------
@@ -408,20 +425,23 @@ class Dashboard:
                 </div>
                 """, unsafe_allow_html=True)
 
-    def render_validation_overview(self, df, report_info):
+    def render_validation_overview(self, df, report_info, counts=None):
         st.header("📊 Validation Analytics Overview")
         if df is None or df.empty:
             self.render_no_data_state()
             return
 
         total_invoices = len(df)
+        counts = counts if counts is not None else count_dimensions(df)
 
         # Status buckets
-        if "Validation_Status" in df.columns:
-            vs = df["Validation_Status"].astype("string")
-            passed = int((vs.str.contains("PASS", na=False)).sum())
-            failed = int((vs.str.contains("FAIL", na=False)).sum())
-            warnings = int((vs.str.contains("WARNING", na=False)).sum())
+        if "status" in counts:
+            # Substring matching runs on the distinct labels only
+            vc = counts["status"]
+            labels = vc.index.astype("string")
+            passed = int(vc[labels.str.contains("PASS", na=False)].sum())
+            failed = int(vc[labels.str.contains("FAIL", na=False)].sum())
+            warnings = int(vc[labels.str.contains("WARNING", na=False)].sum())
         else:
             passed = int(total_invoices * 0.6)
             failed = int(total_invoices * 0.25)
@@ -442,35 +462,37 @@ class Dashboard:
         col1, col2, col3, col4 = st.columns(4)
         with col1:
             if "Invoice_Currency" in df.columns and not df["Invoice_Currency"].empty:
-                currencies = df["Invoice_Currency"].nunique()
-                mode = df["Invoice_Currency"].mode()
-                main_currency = mode.iloc[0] if not mode.empty else "INR"
+                currency_counts = counts["currency"]
+                currencies = len(currency_counts)
+                main_currency = currency_counts.index[0] if currencies else "INR"
                 st.metric("💱 Currencies Processed", f"{currencies} currencies", f"Primary: {main_currency}")
 
         with col2:
             if "Location" in df.columns and not df["Location"].empty:
-                loc_first = df["Location"].astype("string").str.split(",").str[0]
-                locations = loc_first.nunique()
-                mode = loc_first.mode()
-                main_location = mode.iloc[0] if not mode.empty else "Delhi"
+                location_counts = counts["location"]
+                locations = len(location_counts)
+                main_location = location_counts.index[0] if locations else "Delhi"
                 st.metric("🌍 Global Locations", f"{locations} locations", f"Primary: {main_location}")
 
         with col3:
             if "Due_Date_Notification" in df.columns:
-                urgent = int(df["Due_Date_Notification"].isin(["YES", "OVERDUE"]).sum())
+                due = counts["due"]
+                urgent = int(due.get("YES", 0) + due.get("OVERDUE", 0))
                 st.metric("⏰ Payment Alerts", f"{urgent} urgent", "Due ≤2 days")
 
         with col4:
             if "Invoice_Creator_Name" in df.columns:
-                known_creators = int((df["Invoice_Creator_Name"].astype("string") != "Unknown").sum())
+                creator_counts = counts["creator"]
+                known_creators = int(creator_counts.sum() - creator_counts.get("Unknown", 0))
                 creator_rate = (known_creators / total_invoices * 100) if total_invoices else 0
                 st.metric("👤 Creator Tracking", f"{known_creators} identified", f"{creator_rate:.1f}% coverage")
 
-    def render_enhanced_charts(self, df):
+    def render_enhanced_charts(self, df, counts=None):
         if df is None or df.empty or not PLOTLY_OK:
             if not PLOTLY_OK:
                 st.info("Plotly not installed. Skipping charts. Install with: `pip install plotly`")
             return
+        counts = counts if counts is not None else count_dimensions(df)
 
         st.header("📈 Enhanced Visual Analytics")
 
@@ -478,7 +500,7 @@ class Dashboard:
         with col1:
             st.subheader("📊 Validation Status Distribution")
             if "Validation_Status" in df.columns:
-                status_counts = df["Validation_Status"].value_counts()
+                status_counts = counts["status"]
                 fig = px.pie(values=status_counts.values, names=status_counts.index, title="Validation Status Breakdown")
                 fig.update_traces(textposition="inside", textinfo="percent+label")
                 st.plotly_chart(fig, use_container_width=True)
@@ -486,9 +508,7 @@ class Dashboard:
         with col2:
             st.subheader("🌍 Location Analysis")
             if "Location" in df.columns and not df["Location"].empty:
-                df_loc = df.copy()
-                df_loc["Location_Clean"] = df_loc["Location"].astype("string").str.split(",").str[0]
-                location_counts = df_loc["Location_Clean"].value_counts().head(10)
+                location_counts = counts["location"].head(10)
                 fig = px.bar(
                     x=location_counts.values,
                     y=location_counts.index,
@@ -502,7 +522,7 @@ class Dashboard:
         with col1:
             if "Invoice_Currency" in df.columns:
                 st.subheader("💱 Currency Distribution")
-                currency_counts = df["Invoice_Currency"].value_counts()
+                currency_counts = counts["currency"]
                 fig = px.pie(values=currency_counts.values, names=currency_counts.index, title="Invoice Currency Breakdown")
                 fig.update_traces(textposition="inside", textinfo="percent+label")
                 st.plotly_chart(fig, use_container_width=True)
@@ -510,7 +530,7 @@ class Dashboard:
         with col2:
             if "Invoice_Creator_Name" in df.columns:
                 st.subheader("👤 Creator Analysis")
-                creator_counts = df["Invoice_Creator_Name"].value_counts().head(8)
+                creator_counts = counts["creator"].head(8)
                 fig = px.bar(x=creator_counts.values, y=creator_counts.index, orientation="h", title="Top Invoice Creators")
                 st.plotly_chart(fig, use_container_width=True)
 
@@ -529,7 +549,7 @@ class Dashboard:
         with col2:
             if "Due_Date_Notification" in df.columns:
                 st.subheader("⏰ Payment Due Date Analysis")
-                due_alerts = df["Due_Date_Notification"].value_counts()
+                due_alerts = counts["due"]
                 fig = px.pie(values=due_alerts.values, names=due_alerts.index, title="Due Date Alert Status")
                 st.plotly_chart(fig, use_container_width=True)
 
@@ -677,8 +697,9 @@ class Dashboard:
         try:
             df, report_info = self.load_latest_data()
             if df is not None and not df.empty:
-                self.render_validation_overview(df, report_info)
-                self.render_enhanced_charts(df)
+                counts = count_dimensions(df)
+                self.render_validation_overview(df, report_info, counts)
+                self.render_enhanced_charts(df, counts)
                 self.render_data_explorer(df, report_info)
             else:
                 self.render_no_data_state()
@@ -0,0 +1,295 @@
+"""
+Equivalence tests for the column-wise rewrites: the new code must produce the
+same output as the row-by-row / plain-pandas code it replaced, on small fixtures.
+"""
+import logging
+import os
+import re
+import sys
+from datetime import datetime
+
+import chardet
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook, load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+import reporter  # noqa: E402
+
+
+@pytest.fixture
+def processor():
+    return main.LocalFileProcessor("test_session", rms_enabled=True,
+                                   logger=logging.getLogger("test_equivalence"))
+
+
+@pytest.fixture
+def invoice_frame():
+    return pd.DataFrame({
+        "Invoice No": ["INV1", "INV2", None, "", "INV5", "nan", 7.0, " INV8 "],
+        "Vendor Name": ["Acme 27AAPFU0939F1ZV", "unknown", None, "X", "Y", "Z", "W", ""],
+        "Total Amount": ["1,200.50", "-5", "abc", None, "2000000", "0", 3, "₹ 99"],
+        "GSTIN": [None, "29ABCDE1234F1Z5", "bad", "", "", "", None, "x"],
+        "Invoice Date": ["2024-01-05", "05/02/2024", None, "junk",
+                         pd.Timestamp("2024-03-01"), "", "2024/04/04", "31-12-2023"],
+        "Due Date": [None, "2024-02-20", "", "", "", "", "", "2024-13-45"],
+        "Currency": ["inr", None, "usd ", "", "none", "EUR", "gbp", "NaN"],
+        "Location": [None, "Delhi", "", "nan", "Pune", "", "", ""],
+        "City": ["Mumbai", "X", None, "", "", "", "Goa", "Agra"],
+        "Payment Method": ["NEFT", "", "", "", "", "", "", "UPI"],
+        "Account Head": ["", "Travel", "", "", "", "", "", None],
+    })
+
+
+# ---------------------------------------------------------------------------
+# Reference: the per-row logic build_invoice_records replaced
+# ---------------------------------------------------------------------------
+
+_REF_KEYWORDS = {
+    "inv_date": ("invoice_date", "inv_date", "bill_date", "date", "created_date"),
+    "due_date": ("due", "due_date", "payment_due", "pay_date", "expiry"),
+    "currency": ("currency", "curr", "ccy", "cur_code"),
+    "location": ("location", "site", "branch", "office", "city", "state"),
+    "mop": ("payment", "pay_method", "mop", "method", "pay_mode"),
+    "account_head": ("account", "acc_head", "gl_code", "cost_center", "dept"),
+}
+_REF_GST = re.compile(r"\b\d{2}[A-Z]{5}\d{4}[A-Z][A-Z0-9]Z[A-Z0-9]\b", re.I)
+
+
+def _ref_date(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    try:
+        if hasattr(value, "strftime"):
+            return value.strftime("%Y-%m-%d")
+    except Exception:
+        pass
+    s = str(value).strip()
+    if not s or s.lower() in ("nan", "none", "nat"):
+        return None
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(s, fmt).strftime("%Y-%m-%d")
+        except Exception:
+            continue
+    return None
+
+
+def _ref_amount(value):
+    if pd.isna(value):
+        return None
+    s = re.sub(r"[^\d.-]", "", str(value).strip())
+    try:
+        return float(s) if s else None
+    except ValueError:
+        return None
+
+
+def _ref_text(row, field, default="", upper=False):
+    for col in row.index:
+        if any(k in str(col).lower() for k in _REF_KEYWORDS[field]):
+            val = str(row.get(col, "")).strip()
+            if upper:
+                val = val.upper()
+            if val and val.lower() not in ("nan", "none"):
+                return val
+    return default
+
+
+def _ref_first_date(row, field):
+    for col in row.index:
+        if any(k in str(col).lower() for k in _REF_KEYWORDS[field]):
+            d = _ref_date(row.get(col))
+            if d:
+                return d
+    return ""
+
+
+def _ref_gst(row, mapping):
+    for col in row.index:
+        if any(k in str(col).lower() for k in ("gst", "gstin", "gst_no", "gstnumber", "tax_id", "tin")):
+            m = _REF_GST.search(str(row.get(col, "")).strip())
+            if m:
+                return m.group(0).upper()
+    m = _REF_GST.search(str(row.get(mapping.get("vendor", ""), "")).strip())
+    return m.group(0).upper() if m else ""
+
+
+def _ref_discrepancies(row, mapping):
+    notes = []
+    if mapping.get("amount"):
+        amount = _ref_amount(row.get(mapping["amount"]))
+        if amount is None:
+            notes.append("Invalid or missing amount")
+        elif amount <= 0:
+            notes.append("Zero or negative amount")
+    if mapping.get("vendor"):
+        vendor = str(row.get(mapping["vendor"], "")).strip()
+        if not vendor or vendor.lower() in ("", "nan", "unknown"):
+            notes.append("Missing vendor information")
+    return "; ".join(notes) if notes else None
+
+
+def _reference_records(df, mapping, source_file, session_id, rms_enabled):
+    records = []
+    for index, row in df.iterrows():
+        invoice_number = str(row.get(mapping.get("invoice_number", ""), f"AUTO_{index}")).strip()
+        if not invoice_number or invoice_number.lower() == "nan":
+            continue
+        records.append({
+            "invoice_number": invoice_number,
+            "vendor_name": str(row.get(mapping.get("vendor", ""), "Unknown Vendor")).strip(),
+            "amount": _ref_amount(row.get(mapping.get("amount", ""), None)),
+            "status": "processed",
+            "rms_status": "pending" if rms_enabled else "n/a",
+            "file_path": source_file,
+            "processed_by": f"production_{session_id}",
+            "discrepancies": _ref_discrepancies(row, mapping),
+            "gst_no": _ref_gst(row, mapping),
+            "inv_date": _ref_first_date(row, "inv_date"),
+            "due_date": _ref_first_date(row, "due_date"),
+            "currency": _ref_text(row, "currency", default="USD", upper=True),
+            "location": _ref_text(row, "location"),
+            "mop": _ref_text(row, "mop"),
+            "account_head": _ref_text(row, "account_head"),
+        })
+    return records
+
+
+def _comparable(records):
+    """Drop the fields that legitimately differ (timestamped notes, hash scheme)."""
+    return [{k: v for k, v in r.items() if k not in ("notes", "hash_value")} for r in records]
+
+
+# ---------------------------------------------------------------------------
+# build_invoice_records
+# ---------------------------------------------------------------------------
+
+def test_build_invoice_records_matches_row_loop(processor, invoice_frame):
+    mapping = processor.map_dataframe_columns(invoice_frame)
+    expected = _reference_records(invoice_frame, mapping, "f.csv", processor.session_id, True)
+    assert _comparable(processor.build_invoice_records(invoice_frame, "f.csv")) == expected
+
+
+def test_build_invoice_records_from_csv_fixture(processor, invoice_frame, tmp_path):
+    path = tmp_path / "invoices.csv"
+    invoice_frame.to_csv(path, index=False)
+    df = processor.clean_dataframe(processor.read_local_file(path))
+    mapping = processor.map_dataframe_columns(df)
+    expected = _reference_records(df, mapping, str(path), processor.session_id, True)
+    assert _comparable(processor.build_invoice_records(df, str(path))) == expected
+
+
+def test_build_invoice_records_without_mapped_columns(processor):
+    df = pd.DataFrame({"foo": [1, 2], "bar": ["a", "b"]})
+    expected = _reference_records(df, {}, "f.csv", processor.session_id, True)
+    got = _comparable(processor.build_invoice_records(df, "f.csv"))
+    assert got == expected
+    assert [r["invoice_number"] for r in got] == ["AUTO_0", "AUTO_1"]
+
+
+def test_build_invoice_records_survives_bad_cells(processor):
+    class Unformattable:
+        def strftime(self, fmt):
+            raise ValueError("cannot format")
+
+        def __str__(self):
+            return "2024-05-06"
+
+    df = pd.DataFrame({
+        "Invoice No": ["A", "B"],
+        "Vendor Name": ["x", "y"],
+        "Invoice Date": [Unformattable(), "2024-01-02"],
+        "Notes": [[1, 2], {"a": 1}],  # unhashable cells
+    })
+    records = processor.build_invoice_records(df, "f.csv")
+    assert [r["inv_date"] for r in records] == ["2024-05-06", "2024-01-02"]
+    assert len({r["hash_value"] for r in records}) == 2
+
+
+def test_check_discrepancies_row_wrapper(processor, invoice_frame):
+    mapping = processor.map_dataframe_columns(invoice_frame)
+    for _, row in invoice_frame.iterrows():
+        assert processor.check_discrepancies(row, mapping) == _ref_discrepancies(row, mapping)
+
+
+# ---------------------------------------------------------------------------
+# read_local_file
+# ---------------------------------------------------------------------------
+
+def _values(df):
+    """Cell values as plain Python objects, missing as None, for dtype-agnostic comparison."""
+    out = df.astype(object).where(df.notna(), None)
+    return [list(out.columns)] + [list(r) for r in out.itertuples(index=False, name=None)]
+
+
+@pytest.fixture
+def table_frame():
+    return pd.DataFrame({
+        "Invoice No": ["INV1", "INV2", "INV3"],
+        "Vendor": ["Acme", None, "Föö GmbH"],
+        "Qty": [1, 2, 3],
+        "Amount": [10.5, None, 3.25],
+    })
+
+
+@pytest.mark.parametrize("suffix, sep", [(".csv", ","), (".tsv", "\t"), (".txt", ",")])
+def test_read_local_file_text_matches_pandas(processor, table_frame, tmp_path, suffix, sep):
+    path = tmp_path / f"table{suffix}"
+    table_frame.to_csv(path, index=False, sep=sep)
+    expected = pd.read_csv(path, encoding="utf-8", delimiter=sep)
+    assert _values(processor.read_local_file(path)) == _values(expected)
+
+
+def test_read_local_file_non_utf8_csv(processor, table_frame, tmp_path):
+    path = tmp_path / "latin1.csv"
+    table_frame.to_csv(path, index=False, encoding="latin-1")
+    # The replaced reader: chardet over the first 10 kB, then the C parser
+    with open(path, "rb") as f:
+        encoding = chardet.detect(f.read(10000))["encoding"] or "utf-8"
+    expected = pd.read_csv(path, encoding=encoding)
+    assert _values(processor.read_local_file(path)) == _values(expected)
+
+
+def test_read_local_file_xlsx_matches_pandas(processor, table_frame, tmp_path):
+    path = tmp_path / "table.xlsx"
+    table_frame.to_excel(path, index=False, engine="openpyxl")
+    expected = pd.read_excel(path, engine="openpyxl")
+    assert _values(processor.read_local_file(path)) == _values(expected)
+
+
+# ---------------------------------------------------------------------------
+# reporter.write_data_sheet
+# ---------------------------------------------------------------------------
+
+def _sheet_values(path, sheet_name):
+    ws = load_workbook(path)[sheet_name]
+    return [list(r) for r in ws.iter_rows(values_only=True)]
+
+
+def test_write_data_sheet_matches_to_excel(tmp_path):
+    df = pd.DataFrame({
+        "Invoice No": ["INV1", "INV2", "INV3"],
+        "Status": ["VALID", "INVALID", None],
+        "Amount": [10.5, np.nan, 3],
+        "Count": [1, 2, 3],
+        "Date": pd.to_datetime(["2024-01-01", None, "2024-03-01"]),
+    })
+
+    new_path = tmp_path / "new.xlsx"
+    wb = Workbook(write_only=True)
+    reporter.write_data_sheet(wb, "ALL_DATA", df, reporter.STATUS_COLORS["VALID"])
+    wb.save(new_path)
+
+    old_path = tmp_path / "old.xlsx"
+    df.to_excel(old_path, sheet_name="ALL_DATA", index=False, engine="openpyxl")
+
+    assert _sheet_values(new_path, "ALL_DATA") == _sheet_values(old_path, "ALL_DATA")
+
+    ws = load_workbook(new_path)["ALL_DATA"]
+    assert ws.freeze_panes == "A2"
+    assert ws.auto_filter.ref == "A1:E4"
+    assert ws["A1"].font.bold
@@ -0,0 +1,17 @@
+# utils/excel.py
+from __future__ import annotations
+from typing import List
+import pandas as pd
+
+
+def column_widths(df: pd.DataFrame, cap: int) -> List[int]:
+    """Autosize widths for a sheet written from df: longest header/value + 2, capped.
+
+    One pandas string-length pass per column instead of walking openpyxl cells.
+    """
+    widths = []
+    for name, col in df.items():
+        longest = col.astype("string").str.len().max()
+        longest = 0 if pd.isna(longest) else int(longest)
+        widths.append(min(max(longest, len(str(name))) + 2, cap))
+    return widths
@@ -1,36 +1,83 @@
 # utils/file_readers.py
 from __future__ import annotations
-import os, io, re, json
+import os, io, re, json, csv, mmap
+from contextlib import nullcontext
 import pandas as pd
 import chardet
 
+# Rust-based Excel reader (pandas engine="calamine"); openpyxl/xlrd remain the fallback
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_OK = True
+except Exception:
+    CALAMINE_OK = False
+
 # Signatures / patterns
 OLE_SIGNATURE = b"\xD0\xCF\x11\xE0"  # legacy .xls (BIFF in OLE)
 ZIP_SIGNATURE = b"PK\x03\x04"        # .xlsx container
 PDF_SIGNATURE = b"%PDF"
 HTML_PATTERN = re.compile(br"(?is)\s*<!DOCTYPE|<html|<table")
 
-def _read_text_like(buf: bytes) -> pd.DataFrame | None:
-    # HTML tables disguised as .xls
-    if HTML_PATTERN.search(buf):
-        try:
-            text = buf.decode("utf-8", errors="replace")
-            tables = pd.read_html(io.StringIO(text))
-            if tables:
-                return pd.concat(tables, ignore_index=True)
-        except Exception:
-            pass
+# Leading-byte dispatch table, checked in order: binary containers first
+BINARY_SIGNATURES = (
+    (ZIP_SIGNATURE, "xlsx"),
+    (OLE_SIGNATURE, "xls"),
+    (PDF_SIGNATURE, "pdf"),
+)
+HTML_PREFIXES = (b"<!doctype", b"<html", b"<table", b"<?xml")
+SNIFF_BYTES = 64
+# Formats parsed from the path; their bytes never need copying out of the map
+PATH_FORMATS = {fmt for _, fmt in BINARY_SIGNATURES}
+
+def detect_table_format(head: bytes) -> str:
+    """Classify content from its first bytes: 'xlsx'|'xls'|'pdf'|'html'|'json'|'csv'."""
+    for sig, fmt in BINARY_SIGNATURES:
+        if head.startswith(sig):
+            return fmt
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith(HTML_PREFIXES):
+        return "html"
+    if text[:1] in (b"{", b"["):
+        return "json"
+    return "csv"
+
+def _read_html_text(buf: bytes) -> pd.DataFrame | None:
+    try:
+        text = buf.decode("utf-8", errors="replace")
+        tables = pd.read_html(io.StringIO(text))
+        if tables:
+            return pd.concat(tables, ignore_index=True)
+    except Exception:
+        pass
+    return None
 
-    # Encoding + CSV/TSV/semicolon/pipe
+def _decode(buf: bytes) -> str:
     enc = chardet.detect(buf or b"").get("encoding") or "utf-8"
-    text = buf.decode(enc, errors="replace")
-    for sep in ("\t", ",", ";", "|"):
-        try:
-            df = pd.read_csv(io.StringIO(text), sep=sep)
-            if df.shape[0] > 0 or df.shape[1] > 1:
-                return df
-        except Exception:
-            pass
+    return buf.decode(enc, errors="replace")
+
+def _sniff_separator(text: str) -> str:
+    # Whole lines only, so a truncated last row can't skew the guess
+    sample = text[:8192]
+    if len(text) > len(sample) and "\n" in sample:
+        sample = sample[:sample.rindex("\n")]
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        return ","
+
+def _read_delimited_text(buf: bytes, text: str | None = None) -> pd.DataFrame | None:
+    # Encoding + CSV/TSV/semicolon/pipe, separator sniffed once
+    text = _decode(buf) if text is None else text
+    try:
+        df = pd.read_csv(io.StringIO(text), sep=_sniff_separator(text), engine="c", low_memory=False)
+        if df.shape[0] > 0 or df.shape[1] > 1:
+            return df
+    except Exception:
+        pass
+    return None
+
+def _read_json_text(buf: bytes, text: str | None = None) -> pd.DataFrame | None:
+    text = _decode(buf) if text is None else text
 
     # JSON array of objects
     try:
@@ -50,18 +97,51 @@ def _read_text_like(buf: bytes) -> pd.DataFrame | None:
 
     return None
 
-def _read_excel_by_signature(path: str, head: bytes) -> pd.DataFrame | None:
-    if head.startswith(OLE_SIGNATURE):
-        try:
-            return pd.read_excel(path, engine="xlrd")
-        except Exception:
-            return None
-    if head.startswith(ZIP_SIGNATURE):
+def _read_text_like(buf: bytes) -> pd.DataFrame | None:
+    # HTML tables disguised as .xls
+    if HTML_PATTERN.search(buf):
+        df = _read_html_text(buf)
+        if df is not None:
+            return df
+
+    text = _decode(buf)
+    df = _read_delimited_text(buf, text)
+    if df is not None:
+        return df
+    return _read_json_text(buf, text)
+
+def _read_xlsx_streaming(path: str) -> pd.DataFrame:
+    """First sheet via openpyxl read-only mode: rows are streamed, no styles/formulas kept."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = list(wb.worksheets[0].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+    # Trailing blank rows are not data (pandas trims them too)
+    while rows and all(v is None for v in rows[-1]):
+        rows.pop()
+    if not rows:
+        return pd.DataFrame()
+
+    header = [f"Unnamed: {i}" if h is None else h for i, h in enumerate(rows[0])]
+    return pd.DataFrame(rows[1:], columns=header)
+
+def _read_excel(path: str, engine: str) -> pd.DataFrame | None:
+    # calamine streams both .xlsx and legacy .xls without building a workbook DOM
+    if CALAMINE_OK:
         try:
-            return pd.read_excel(path, engine="openpyxl")
+            return pd.read_excel(path, engine="calamine")
         except Exception:
-            return None
-    return None
+            pass
+    try:
+        if engine == "openpyxl":
+            return _read_xlsx_streaming(path)
+        return pd.read_excel(path, engine=engine)
+    except Exception:
+        return None
 
 def _read_pdf_minimal(path: str) -> pd.DataFrame | None:
     try:
@@ -76,7 +156,7 @@ def _read_pdf_minimal(path: str) -> pd.DataFrame | None:
             text = page.get_text("text")
             for ln in text.splitlines():
                 parts = re.split(r"\s{2,}|\t|,|;", ln.strip())
-                parts = [p.strip() for p in parts if p.strip()]
+                parts = [p for p in map(str.strip, parts) if p]
                 if len(parts) >= 2:
                     lines.append(parts)
         doc.close()
@@ -92,31 +172,39 @@ def _read_pdf_minimal(path: str) -> pd.DataFrame | None:
     except Exception:
         return None
 
+# Format -> reader(path, raw_bytes)
+_READERS = {
+    "xlsx": lambda path, raw: _read_excel(path, "openpyxl"),
+    "xls": lambda path, raw: _read_excel(path, "xlrd"),
+    "pdf": lambda path, raw: _read_pdf_minimal(path),
+    "html": lambda path, raw: _read_html_text(raw),
+    "json": lambda path, raw: _read_json_text(raw),
+    "csv": lambda path, raw: _read_delimited_text(raw),
+}
+
 def smart_read_table(path: str) -> pd.DataFrame:
     """
     Open Excel/CSV/TSV/HTML/JSON/NDJSON—and simple PDFs—by sniffing content,
     not file extension.
     """
+    # Map the file read-only: the header check is a slice of the map, and the
+    # bytes are only copied out when a text parser actually needs them
     with open(path, "rb") as f:
-        head = f.read(8)
-        f.seek(0)
-        raw = f.read()
-
-    # Excel by signature
-    df = _read_excel_by_signature(path, head)
-    if df is not None:
-        return df
-
-    # Text-like
-    df = _read_text_like(raw)
-    if df is not None:
-        return df
+        empty = os.fstat(f.fileno()).st_size == 0  # zero-length files can't be mapped
+        with (nullcontext(b"") if empty else mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)) as mm:
+            fmt = detect_table_format(mm[:SNIFF_BYTES])
+            raw = None if fmt in PATH_FORMATS else mm[:]
+
+            # Go straight to the parser the leading bytes point at
+            df = _READERS[fmt](path, raw)
+            if df is not None:
+                return df
 
-    # PDF simple fallback
-    if head.startswith(PDF_SIGNATURE):
-        df = _read_pdf_minimal(path)
-        if df is not None:
-            return df
+            # Mislabelled content: fall back to the remaining readers
+            # (Excel/PDF signatures were already handled by the dispatch above)
+            df = _read_text_like(mm[:] if raw is None else raw)
+            if df is not None:
+                return df
 
     # Last resorts
     for attempt in (
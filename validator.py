@@ -1,4 +1,6 @@
 import os
+import sys
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -14,6 +16,11 @@ except Exception as e:
     def send_email_report(*args, **kwargs):
         print("ℹ️ Skipping email report—email_sender not present.")
 
+# Row severity as small ints so the worst finding wins via max()
+SEV_VALID = 0
+SEV_ISSUES = 1
+SEVERITY_LABELS = {SEV_VALID: '✅ Valid', SEV_ISSUES: '⚠️ Issues Found'}
+
 def get_latest_data_folder(base="data"):
     """Get the most recent data folder"""
     try:
@@ -154,9 +161,11 @@ def run_validation_workflow():
         result_path = os.path.join(base_dir, "validation_result.xlsx")
         zip_path = os.path.join(base_dir, "invoices.zip")
         
-        print(f"📁 Working directory: {base_dir}")
-        print(f"📄 Result path: {result_path}")
-        print(f"📦 ZIP path: {zip_path}")
+        sys.stdout.write(
+            f"📁 Working directory: {base_dir}\n"
+            f"📄 Result path: {result_path}\n"
+            f"📦 ZIP path: {zip_path}\n"
+        )
         
         # 4. Load invoice data (actual or sample)
         df = load_actual_invoice_data(base_dir)
@@ -170,17 +179,18 @@ def run_validation_workflow():
         try:
             issues, problematic_invoices = validate_invoices(df)
             
-            # Add validation results to dataframe
-            df['Validation_Status'] = '✅ Valid'
-            df['Issues_Found'] = ''
+            # Add validation results to dataframe: one severity pass over the index
+            flagged = df.index.isin(problematic_invoices.index)
+            severity = np.where(flagged, SEV_ISSUES, SEV_VALID).astype(np.int8)
+            # Low-cardinality label columns are stored as category (int8 codes)
+            df['Validation_Status'] = pd.Categorical.from_codes(
+                severity, categories=[SEVERITY_LABELS[k] for k in sorted(SEVERITY_LABELS)]
+            )
+            df['Issues_Found'] = pd.Categorical(np.where(severity > SEV_VALID, 'See validation report', ''))
             
-            # Mark problematic invoices
-            if not problematic_invoices.empty:
-                # Find indices of problematic invoices in main dataframe
-                for idx, row in problematic_invoices.iterrows():
-                    if idx < len(df):
-                        df.loc[idx, 'Validation_Status'] = '⚠️ Issues Found'
-                        df.loc[idx, 'Issues_Found'] = 'See validation report'
+            # Only the count is needed from here on; release the copied issue rows
+            problematic_count = len(problematic_invoices)
+            del problematic_invoices
             
             print(f"✅ Validation completed: {len(issues)} issues found")
             
@@ -190,13 +200,14 @@ def run_validation_workflow():
             df['Validation_Status'] = '❌ Validation Failed'
             df['Issues_Found'] = str(e)
             issues = [f"Validation process failed: {str(e)}"]
-            problematic_invoices = pd.DataFrame()
+            problematic_count = 0
         
-        # 6. Add additional validation columns for compatibility
+        # 6. Add additional validation columns for compatibility (vectorized over the status column)
+        status = df['Validation_Status'].astype(str)
         if 'Correct' not in df.columns:
-            df['Correct'] = df['Validation_Status'].apply(lambda x: '✅' if x == '✅ Valid' else '❌')
+            df['Correct'] = np.where(status.eq('✅ Valid'), '✅', '❌')
         if 'Flagged' not in df.columns:
-            df['Flagged'] = df['Validation_Status'].apply(lambda x: '🚩' if 'Issues' in x else '')
+            df['Flagged'] = np.where(status.str.contains('Issues', regex=False), '🚩', '')
         if 'Modified Since Last Check' not in df.columns:
             df['Modified Since Last Check'] = ''
         if 'Late Upload' not in df.columns:
@@ -236,23 +247,26 @@ def run_validation_workflow():
             ok = send_email_report(result_path, zip_path, delta_report=delta_report)
             print("✅ Email report sent successfully" if ok else "ℹ️ Email step skipped")
         
-        # 10. Print summary
-        print("\n📋 Validation Summary:")
-        print(f"  - Total invoices processed: {len(df)}")
-        print(f"  - Issues found: {len(issues) if issues else 0}")
-        print(f"  - Problematic invoices: {len(problematic_invoices)}")
-        print(f"  - Results saved to: {result_path}")
+        # 10. Print summary (collected and written in one go)
+        lines = [
+            "\n📋 Validation Summary:",
+            f"  - Total invoices processed: {len(df)}",
+            f"  - Issues found: {len(issues) if issues else 0}",
+            f"  - Problematic invoices: {problematic_count}",
+            f"  - Results saved to: {result_path}",
+        ]
         
         # Display summary statistics
         try:
             summary = get_invoice_summary(df)
             if 'amount_summary' in summary:
-                print(f"  - Total amount: ₹{summary['amount_summary']['total_amount']:,.2f}")
-                print(f"  - Average amount: ₹{summary['amount_summary']['average_amount']:,.2f}")
+                lines.append(f"  - Total amount: ₹{summary['amount_summary']['total_amount']:,.2f}")
+                lines.append(f"  - Average amount: ₹{summary['amount_summary']['average_amount']:,.2f}")
         except:
             pass
         
-        print("✅ Validation workflow completed successfully!")
+        lines.append("✅ Validation workflow completed successfully!")
+        sys.stdout.write("\n".join(lines) + "\n")
         return True
         
     except Exception as e:
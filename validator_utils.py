@@ -1,4 +1,6 @@
 import os
+import sys
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import glob
@@ -20,6 +22,10 @@ COLUMN_MAP_PRIORITIES = {
     "scid":           ["SCID#","SCID","SC Id","SalesContractId","SaleContractID"],
 }
 
+# Leading bytes of legacy .xls (OLE2 compound file) and .xlsx (ZIP) workbooks
+OLE_SIGNATURE = b"\xd0\xcf\x11\xe0"
+ZIP_SIGNATURE = b"PK\x03\x04"
+
 def _choose_first(df, names):
     for n in names:
         if n in df.columns: return n
@@ -122,25 +128,34 @@ def try_read_file(file_path):
             return pd.read_excel(file_path, engine='openpyxl')
 
         elif file_path.endswith('.xls'):
-            try:
-                return pd.read_excel(file_path, engine='xlrd')
-            except Exception:
+            # One handle: sniff the 8-byte signature, then rewind for whichever reader applies
+            with open(file_path, 'rb') as f:
+                header = f.read(8)
+                f.seek(0)
+                if header.startswith(OLE_SIGNATURE):
+                    try:
+                        return pd.read_excel(f, engine='xlrd')
+                    except Exception:
+                        f.seek(0)
+                elif header.startswith(ZIP_SIGNATURE):
+                    return pd.read_excel(f, engine='openpyxl')
+
                 print(f"⚠️ Not a real Excel: {file_path}, trying as text fallback")
 
                 # Try decoding content
-                with open(file_path, 'rb') as f:
-                    content = f.read(2048)
-                    try:
-                        sample = content.decode('utf-8')
-                    except UnicodeDecodeError:
-                        sample = content.decode('latin1')
+                content = f.read(2048)
+                f.seek(0)
+                try:
+                    sample = content.decode('utf-8')
+                except UnicodeDecodeError:
+                    sample = content.decode('latin1')
 
                 if '\t' in sample:
                     print("🔄 Detected TSV format")
-                    return pd.read_csv(file_path, sep='\t', encoding='utf-8', engine='python')
+                    return pd.read_csv(f, sep='\t', encoding='utf-8', engine='python')
                 else:
                     print("🔄 Detected CSV format")
-                    return pd.read_csv(file_path, encoding='utf-8', engine='python')
+                    return pd.read_csv(f, encoding='utf-8', engine='python')
 
         elif file_path.endswith('.csv'):
             return pd.read_csv(file_path, encoding='utf-8', engine='python')
@@ -154,6 +169,24 @@ def try_read_file(file_path):
     except Exception as e:
         raise ValueError(f"❌ Failed to read {file_path}: {str(e)}")
 
+def parse_invoice_dates(series):
+    """Parse with the explicit ISO format (fast path); only unparsed values fall back to inference"""
+    parsed = pd.to_datetime(series, format="%Y-%m-%d", errors='coerce')
+    retry = parsed.isna() & series.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(series[retry], errors='coerce')
+    return parsed
+
+def filter_invoices_by_date(df, start_date, end_date, date_col="ParsedInvoiceDate"):
+    """
+    Rows with start_date <= date_col <= end_date.
+    df must already be sorted by date_col (NaT last), so the range is two binary searches.
+    """
+    values = df[date_col].to_numpy()
+    i0 = values.searchsorted(np.datetime64(start_date), side="left")
+    i1 = values.searchsorted(np.datetime64(end_date), side="right")
+    return df.iloc[i0:i1]
+
 def scan_invoice_files(base_folder='data', date_range_days=3):
     """
     Scan invoice files with configurable date range
@@ -196,12 +229,10 @@ def scan_invoice_files(base_folder='data', date_range_days=3):
                 print(f"⚠️ Skipping {file}: 'PurchaseInvDate' column missing.\n")
                 continue
 
-            # Parse dates and filter
-            df["ParsedInvoiceDate"] = pd.to_datetime(df["PurchaseInvDate"], errors='coerce')
-            filtered_df = df[
-                (df["ParsedInvoiceDate"] >= start_date) &
-                (df["ParsedInvoiceDate"] <= today)
-            ]
+            # Parse dates once, sort, and slice the window
+            df["ParsedInvoiceDate"] = parse_invoice_dates(df["PurchaseInvDate"])
+            df = df.sort_values("ParsedInvoiceDate", kind="stable").reset_index(drop=True)
+            filtered_df = filter_invoices_by_date(df, start_date, today)
 
             if not filtered_df.empty:
                 print(f"✅ Invoices in range {start_date.date()} to {today.date()}: {len(filtered_df)}\n")
@@ -220,6 +251,10 @@ def scan_invoice_files(base_folder='data', date_range_days=3):
     print(f"📊 Total combined invoices: {len(combined_df)}")
     return combined_df
 
+def _missing(s):
+    """Boolean mask of null or blank cells, computed once per column"""
+    return (s.isna() | s.astype('string').str.strip().eq('')).fillna(True).astype(bool)
+
 def validate_invoices(df):
     """
     Enhanced validation function with better error handling and reporting
@@ -249,14 +284,11 @@ def validate_invoices(df):
 
     # Check for missing values in existing required columns
     existing_required_fields = [field for field in required_fields if field in df.columns]
+    missing_masks = {field: _missing(df[field]) for field in existing_required_fields}
     
     for field in existing_required_fields:
         # Check for null/empty values
-        null_mask = df[field].isna()
-        empty_mask = df[field].astype(str).str.strip() == ''
-        missing_mask = null_mask | empty_mask
-        
-        missing = df[missing_mask]
+        missing = df[missing_masks[field]]
         if not missing.empty:
             issues.append(f"❌ {len(missing)} rows missing values in '{field}'")
             rows_with_issues = pd.concat([rows_with_issues, missing])
@@ -265,7 +297,7 @@ def validate_invoices(df):
     # Check for duplicate invoice numbers
     if 'PurchaseInvNo' in df.columns:
         # Remove null values before checking duplicates
-        non_null_invoices = df[df['PurchaseInvNo'].notna() & (df['PurchaseInvNo'].astype(str).str.strip() != '')]
+        non_null_invoices = df[~missing_masks['PurchaseInvNo']]
         
         if not non_null_invoices.empty:
             duplicates = non_null_invoices[non_null_invoices.duplicated('PurchaseInvNo', keep=False)]
@@ -309,18 +341,20 @@ def validate_invoices(df):
     if not rows_with_issues.empty:
         rows_with_issues = rows_with_issues.drop_duplicates()
 
-    # Print validation summary
+    # Print validation summary as a single write
     if issues:
-        print("\n🚨 Validation Issues Found:")
-        for i, issue in enumerate(issues, 1):
-            print(f" {i}. {issue}")
+        lines = ["\n🚨 Validation Issues Found:"]
+        lines += [f" {i}. {issue}" for i, issue in enumerate(issues, 1)]
     else:
-        print("\n✅ All invoices passed validation checks.")
-
-    print(f"\n🧾 Validation Summary:")
-    print(f"  - Total invoices: {len(df)}")
-    print(f"  - Issues found: {len(issues)}")
-    print(f"  - Rows with issues: {len(rows_with_issues)}")
+        lines = ["\n✅ All invoices passed validation checks."]
+
+    lines += [
+        f"\n🧾 Validation Summary:",
+        f"  - Total invoices: {len(df)}",
+        f"  - Issues found: {len(issues)}",
+        f"  - Rows with issues: {len(rows_with_issues)}",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
     
     return issues, rows_with_issues
 